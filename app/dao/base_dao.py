@@ -15,14 +15,21 @@ class BaseDAO(Generic[T]):
         if not self.db:
             raise RuntimeError("SQLAlchemy not initialized")
 
+    def _commit(self) -> None:
+        # batch_write上下文内只flush（分配主键），由上下文统一提交
+        if self.db.session.info.get('batch_write'):
+            self.db.session.flush()
+        else:
+            self.db.session.commit()
+
     def create(self, obj: T) -> T:
         self.db.session.add(obj)
-        self.db.session.commit()
+        self._commit()
         return obj
 
     def batch_create(self, objects: List[T]) -> List[T]:
         self.db.session.bulk_save_objects(objects)
-        self.db.session.commit()
+        self._commit()
         return objects
 
     def get_by_id(self, id: int, options: List[Any] = None) -> Optional[T]:
@@ -49,6 +56,15 @@ class BaseDAO(Generic[T]):
     def get_by_name(self, name: str, options: List[Any] = None) -> Optional[T]:
         return self.get_by_field('name', name, options)
 
+    def get_by_names(self, names: List[str], options: List[Any] = None) -> List[T]:
+        if not names:
+            return []
+        query = self.db.session.query(self.model).filter(self.model.name.in_(names))
+        if options:
+            for option in options:
+                query = query.options(option)
+        return query.all()
+
     def get_all(self, page: int = 1, per_page: int = 10, options: List[Any] = None) -> Tuple[List[T], int]:
         query = self.db.session.query(self.model)
         if options:
@@ -99,14 +115,14 @@ class BaseDAO(Generic[T]):
         return pagination.items, pagination.total
 
     def update(self, obj: T) -> T:
-        self.db.session.commit()
+        self._commit()
         return obj
 
     def delete(self, id: int) -> bool:
         obj = self.get_by_id(id)
         if obj:
             self.db.session.delete(obj)
-            self.db.session.commit()
+            self._commit()
             return True
         return False
 
@@ -115,7 +131,7 @@ class BaseDAO(Generic[T]):
         for key, value in filter_dict.items():
             query = query.filter(getattr(self.model, key) == value)
         count = query.update(update_dict)
-        self.db.session.commit()
+        self._commit()
         return count
 
     def exists(self, id: int) -> bool:
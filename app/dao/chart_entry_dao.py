@@ -1,6 +1,8 @@
 # app/dao/chart_entry_dao.py
-from typing import Optional
+from typing import Optional, Dict, Any, List
 
+from sqlalchemy import inspect
+from sqlalchemy.dialects.mysql import insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from .base_dao import BaseDAO
@@ -26,6 +28,39 @@ class ChartEntryDAO(BaseDAO[ChartEntry]):
         super().__init__()
         info("ChartEntryDAO initialized")
 
+    def has_unique_key(self, columns: List[str]) -> bool:
+        """
+        检查chart_entry表上是否存在恰好由指定列组成的唯一键（以数据库实际结构为准，而非模型声明）
+
+        Args:
+            columns (List[str]): 唯一键包含的列
+
+        Returns:
+            bool: 存在返回True
+        """
+        inspector = inspect(self.db.engine)
+        table = ChartEntry.__tablename__
+        keys = inspector.get_unique_constraints(table) + [
+            index for index in inspector.get_indexes(table) if index.get('unique')]
+        return any(set(key['column_names']) == set(columns) for key in keys)
+
+    def upsert_many(self, rows: List[Dict[str, Any]], update_fields: List[str]) -> None:
+        """
+        批量插入榜单条目，单条多行 INSERT ... ON DUPLICATE KEY UPDATE
+
+        Args:
+            rows (List[Dict[str, Any]]): 要写入的行，所有行的列集合必须相同
+            update_fields (List[str]): 冲突时需要更新的列
+        """
+        if not rows:
+            return
+        stmt = insert(ChartEntry).values(rows)
+        # 没有需要更新的列时用无变化的赋值占位；INSERT IGNORE会把外键、截断等错误一并吞掉
+        stmt = stmt.on_duplicate_key_update(
+            {field: stmt.inserted[field] for field in update_fields} or {'movie_id': stmt.inserted.movie_id})
+        self.db.session.execute(stmt)
+        self._commit()
+        debug(f"Upserted {len(rows)} chart entries")
 
 
     # ------------------use end----------------------
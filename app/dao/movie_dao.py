@@ -75,6 +75,26 @@ class MovieDAO(BaseDAO[Movie]):
             info(f"No movie found with serial number: {serial_number}")
         return movie
 
+    def get_by_serial_numbers(self, serial_numbers: List[str], options: List = None) -> List[Movie]:
+        """
+        按序列号批量获取电影，一次IN查询
+
+        Args:
+            serial_numbers (List[str]): 电影序列号列表
+            options (List): 预加载选项
+
+        Returns:
+            List[Movie]: 找到的电影列表
+        """
+        if not serial_numbers:
+            return []
+        query = self.db.session.query(Movie).filter(Movie.serial_number.in_(serial_numbers))
+        if options:
+            query = query.options(*options)
+        movies = query.all()
+        debug(f"Batch loaded {len(movies)} of {len(serial_numbers)} movies by serial number")
+        return movies
+
     # ... [其他方法的实现，每个方法都添加类似的注释和日志记录] ...
 
     def delete_movie(self, movie_id: int) -> bool:
@@ -62,6 +62,8 @@ class Chart(DBBaseModel):
 
 class ChartEntry(DBBaseModel):
     __tablename__ = 'chart_entry'
+    # upsert依赖(chart_id, movie_id)唯一键；已有数据库需执行 scripts/migrations/20241201_chart_entry_unique_key.sql
+    __table_args__ = (db.UniqueConstraint('chart_id', 'movie_id', name='uk_chart_entry_chart_movie'),)
     name = db.Column(db.String(256, 'utf8mb4_unicode_ci'), nullable=False, server_default=db.text("''"))
     chart_id = db.Column(db.Integer, db.ForeignKey('chart.id'), nullable=False)
     movie_id = db.Column(db.Integer, db.ForeignKey('movie.id'), nullable=False, server_default=db.text("'0'"))
@@ -29,6 +29,10 @@ class BaseService(Generic[T, D]):
     def create(self, entity: T) -> Optional[T]:
         return self.dao.create(entity) if self._validate_entity(entity) else None
 
+    @_log_exec_time
+    def batch_create(self, entities: List[T]) -> List[T]:
+        return self.dao.batch_create([e for e in entities if self._validate_entity(e)])
+
     @_log_exec_time
     def get_by_id(self, id: int, options: List[Any] = None) -> Optional[T]:
         return self.dao.get_by_id(id, options)
@@ -62,6 +66,10 @@ class BaseService(Generic[T, D]):
     def get_by_name(self, name: str, options: List[Any] = None) -> Optional[T]:
         return self.dao.get_by_name(name, options)
 
+    def get_by_names(self, names: List[str], options: List[Any] = None) -> Dict[str, T]:
+        """按名称批量查询，一次IN查询替代逐个get_by_name，返回 {name: entity}"""
+        return {entity.name: entity for entity in self.dao.get_by_names(list(set(names)), options)}
+
     def search(self, query: str, fields: List[str],
               page: int = 1, per_page: int = 10,
               options: List[Any] = None) -> Tuple[List[T], int]:
@@ -1,7 +1,7 @@
-import json
 import redis
 
 from app.config.app_config import AppConfig
+from app.utils.json_util import JsonUtil
 from app.utils.redis_client import RedisUtil
 
 class CacheService:
@@ -41,11 +41,11 @@ class CacheService:
     def get(self, key: str):
         """从缓存中获取数据"""
         data = self.redis_client.get(key)
-        return json.loads(data) if data else None
+        return JsonUtil.loads(data) if data else None
 
     def set(self, key: str, value: dict, expire: int = 3600):
         """将数据存入缓存"""
-        self.redis_client.setex(key, expire, json.dumps(value))
+        self.redis_client.setex(key, expire, JsonUtil.dumps(value))
 
     def delete(self, key: str):
         """从缓存中删除数据"""
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, List, Dict, Any
 
 from app.dao import ChartEntryDAO
 from app.model.db.movie_model import ChartEntry, Movie
@@ -14,6 +14,46 @@ class ChartEntryService(BaseService[ChartEntry, ChartEntryDAO]):
         super().__init__()
         info("ChartEntryService initialized")
 
+    # upsert冲突时更新的排名字段
+    RANKING_FIELDS = ('name', 'rank', 'score', 'votes')
+
+    # upsert依赖的唯一键及其迁移脚本
+    UNIQUE_KEY_COLUMNS = ['chart_id', 'movie_id']
+    UNIQUE_KEY_MIGRATION = 'scripts/migrations/20241201_chart_entry_unique_key.sql'
+
+    def ensure_unique_key(self) -> None:
+        """
+        确认数据库中chart_entry表已有(chart_id, movie_id)唯一键
+
+        缺少该键时 ON DUPLICATE KEY UPDATE 永远不会命中，每次运行都会插入重复条目，因此直接报错
+        Raises:
+            RuntimeError: 唯一键不存在
+        """
+        if not self.dao.has_unique_key(self.UNIQUE_KEY_COLUMNS):
+            message = (f"chart_entry表缺少(chart_id, movie_id)唯一键，重复运行会插入重复条目，"
+                       f"请先执行迁移脚本: {self.UNIQUE_KEY_MIGRATION}")
+            error(message)
+            raise RuntimeError(message)
+
+    def build_upsert_values(self, entry: ChartEntry, chart_id: int, movie_id: int) -> Dict[str, Any]:
+        """生成榜单条目的写入列值，未设置的字段交给数据库默认值"""
+        values = {'chart_id': chart_id, 'movie_id': movie_id}
+        values.update({field: value for field in self.RANKING_FIELDS
+                       if (value := getattr(entry, field, None)) is not None})
+        return values
+
+    def upsert_many(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        批量保存榜单条目，列集合相同的行合并为一条多行SQL
+        Args:
+            rows (List[Dict[str, Any]]): build_upsert_values 生成的列值
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        for columns, group in groups.items():
+            self.dao.upsert_many(group, [field for field in self.RANKING_FIELDS if field in columns])
+
     def get_by_chart_and_movie(self, chart_id: int, movie_id: int) -> Optional[ChartEntry]:
         """
         根据榜单ID和电影ID获取榜单条目（每个电影只可能有一个榜单）
@@ -96,6 +96,18 @@ class JellyfinService:
         logging.info(f"获取到 {len(movies)} 部电影的信息")
         return movies
 
+    def get_all_movie_names(self) -> List[str]:
+        """
+        获取 Jellyfin 所有库中电影的名称，一次请求取回，供批量判断番号是否已入库；
+        范围与逐部查询的 search_by_serial_number 一致，不限定默认库
+
+        Returns:
+            List[str]: 电影名称列表
+        """
+        names = [movie.name for movie in self.jellyfin_util.get_all_library_movie_info() if movie.name]
+        logging.info(f"获取到 {len(names)} 个电影名称")
+        return names
+
     def search_by_serial_number(self, serial_number: str, user_id: str = '') -> str:
         """
         根据番号搜索电影。
@@ -10,12 +10,23 @@ from app.services.everything_service import EverythingService
 from app.services.jellyfin_service import JellyfinService
 from app.utils.redis_client import RedisUtil
 from app.config.log_config import debug, info, warning, error, critical
-from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
+from typing import Optional, List, Dict
+from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime
 
 
 class MovieService(BaseService[Movie, MovieDAO]):
+    # 关联预加载：多对一用joinedload；集合用selectinload，每个集合一条IN查询，避免多个一对多JOIN产生笛卡尔积
+    RELATION_LOAD_OPTIONS = (
+        joinedload(Movie.studio),
+        selectinload(Movie.actors),
+        selectinload(Movie.directors),
+        selectinload(Movie.seriess),
+        selectinload(Movie.genres),
+        selectinload(Movie.labels),
+        selectinload(Movie.magnets)
+    )
+
     def __init__(self, movie_dao: MovieDAO = None, magnet_dao: MagnetDAO = None,
                  jellyfin_service: JellyfinService = None, everything_service: EverythingService = None,
                  redis_client: RedisUtil = None, cache_service: CacheService = None):
@@ -51,15 +62,16 @@ class MovieService(BaseService[Movie, MovieDAO]):
 
     def get_movie_with_relations(self, serial_number: str) -> Optional[Movie]:
         """获取电影及其所有关联数据"""
-        options = [
-            joinedload(Movie.studio),
-            joinedload(Movie.actors),
-            joinedload(Movie.directors),
-            joinedload(Movie.series),
-            joinedload(Movie.genres),
-            joinedload(Movie.labels)
-        ]
-        return self.get_movie_from_db_by_serial_number(serial_number, options)
+        return self.get_movie_from_db_by_serial_number(serial_number, list(self.RELATION_LOAD_OPTIONS))
+
+    def get_movies_with_relations(self, serial_numbers: List[str]) -> Dict[str, Movie]:
+        """按番号批量获取电影及其关联数据，返回 {番号大写: Movie}"""
+        return self.get_movies_by_serial_numbers(serial_numbers, list(self.RELATION_LOAD_OPTIONS))
+
+    def get_movies_by_serial_numbers(self, serial_numbers: List[str], options: List = None) -> Dict[str, Movie]:
+        """按番号批量获取电影，默认不加载关联数据，仅需判断是否存在或引用主键时使用"""
+        movies = self.movie_dao.get_by_serial_numbers(list(set(serial_numbers)), options)
+        return {movie.serial_number.upper(): movie for movie in movies}
 
 
 
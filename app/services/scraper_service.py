@@ -1,31 +1,83 @@
-import time
-import random
-from typing import Optional, List
-from sqlalchemy.orm import joinedload
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from operator import attrgetter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Any
+import redis
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import instance_dict
 from sqlalchemy.exc import IntegrityError
 
 from app.model.db.movie_model import Movie, Chart, ChartEntry, ChartType
 from app.services import (
     MovieService, ActorService, StudioService, DirectorService,
     GenreService, SeriesService, LabelService, ChartService,
-    ChartTypeService, ChartEntryService, MagnetService, DownloadService, EverythingService, JellyfinService
+    ChartTypeService, ChartEntryService, MagnetService, DownloadService, EverythingService, JellyfinService,
+    CacheService
 )
+from app.utils.db_util import db, batch_write
 from app.utils.download_client import DownloadStatus
-from app.utils.http_util import HttpUtil
+from app.utils.http_util import HttpUtil, ProxyExhaustedError
+from app.utils.json_util import JsonUtil
 from app.utils.parser.parser_factory import ParserFactory
 from app.config.log_config import info, error
-from app.config.log_config import LogUtil
+from app.config.log_config import LogUtil, LogConfig
 from app.config.app_config import AppConfig
 
 logger = LogUtil.get_logger()
 
+MAGNET_URI_PREFIX = 'magnet:?xt=urn:btih:'
+# 番号 -> 详情页URI 的Redis哈希表，重复运行时跳过搜索请求
+SERIAL_URI_KEY_PREFIX = 'javdb:serial_uri:'
+# 搜索无结果的番号，按TTL过期后重新搜索，新发行的影片最终仍会被收录
+SEARCH_MISS_KEY_PREFIX = 'javdb:search_miss:'
+# 已完成（无需再添加下载任务）的下载状态
+DOWNLOAD_DONE_STATUSES = frozenset((DownloadStatus.COMPLETED.value, DownloadStatus.IN_LIBRARY.value))
+
+
+@dataclass(slots=True)
+class FailedEntry:
+    """处理失败的榜单条目"""
+    serial_number: str
+    chart_name: str
+    error: str
+    time: str
+
 
 class ScraperService:
     """电影数据抓取与处理服务"""
 
+    # 更新已有电影时复制的基础字段，getter在类加载时预先构建
+    _BASIC_FIELDS = (
+        'name', 'title', 'pic_cover', 'release_date', 'length',
+        'have_mg', 'have_file', 'have_hd', 'have_sub'
+    )
+    _get_basic_fields = attrgetter(*_BASIC_FIELDS)
+
+    # 多对多关联属性 -> 对应服务
+    _RELATION_MAP = {
+        'actors': 'actor',
+        'directors': 'director',
+        'seriess': 'series',
+        'genres': 'genre',
+        'labels': 'label',
+        'magnets': 'magnet'
+    }
+    # 从属于单部电影的实体（一对多，外键在实体上），不提前单独插入，随所属电影一起写入
+    _OWNED_SERVICE_KEYS = frozenset({'magnet'})
+
     def __init__(self):
         config = AppConfig().get_web_scraper_config()
         self.base_url = config.get('javdb_url', "https://javdb.com")
+        # 搜索URL只有番号部分变化，前缀初始化时拼好
+        self._search_url_prefix = f'{self.base_url}/search?q='
+        self.scrape_workers = max(1, int(config.get('scrape_workers', 4)))
+        self.search_miss_ttl = int(config.get('search_miss_ttl', 7 * 24 * 3600))
+        self.serial_uri_ttl = int(config.get('serial_uri_ttl', 30 * 24 * 3600))
+        # 为False时已在库的电影跳过抓取（搜索页+详情页），直接使用库中记录
+        self.refresh_existing = bool(config.get('refresh_existing', True))
         logger.info(f"初始化ScraperService，基础URL: {self.base_url}")
 
         # 初始化服务
@@ -43,57 +95,246 @@ class ScraperService:
             'magnet': MagnetService(),
             'download': DownloadService(),
             'everything': EverythingService(),
-            'jellyfin': JellyfinService()
+            'jellyfin': JellyfinService(),
+            'cache': CacheService()
         }
+        # 同时绑定为实例属性（如 self.movie_service），固定服务直接属性访问，免去字典查找
+        for name, service in self.service_map.items():
+            setattr(self, f'{name}_service', service)
         logger.info(f"已初始化 {len(self.service_map)} 个服务")
 
         self.http_util = HttpUtil()
         self.parser = ParserFactory.get_parser()
         logger.info("HTTP工具和解析器已准备就绪")
 
+        # 关联实体缓存 {(service_key, name): entity}
+        self._entity_cache: Dict[Tuple[str, str], Any] = {}
+        # 预取时确认数据库中不存在的实体键，可跳过get_by_name直接创建
+        self._missing_keys: set = set()
+        # 本次运行已入库的电影 {番号大写: Movie}，同一番号出现在多个榜单时只抓取一次
+        self._run_movies: Dict[str, Movie] = {}
+        # 当前榜单已在库中的电影 {番号大写: Movie或None}，None表示已确认不存在
+        self._chart_existing_movies: Dict[str, Optional[Movie]] = {}
+        # 本次运行开始时的Jellyfin库电影名（大写，换行拼接），None表示未加载，逐部查询
+        self._jellyfin_index: Optional[str] = None
+        # 本次运行的榜单类型，process_all_charts期间有效
+        self._current_chart_type: Optional[ChartType] = None
+        # 失败条目逐条追加到JSONL文件，首次失败时才创建
+        self._failed_path: Optional[Path] = None
+        self._failed_fp = None
+        # 当前榜单已记录过失败的番号，榜单整体回滚时不再重复记录
+        self._chart_failed_serials: set = set()
+
     def process_all_charts(self):
         """处理所有榜单数据"""
+        # 整个运行复用同一个会话；提交后不过期对象，缓存中的实体跨榜单无需重新加载
+        session = db.session()
+        expire_on_commit, session.expire_on_commit = session.expire_on_commit, False
         try:
             logger.info("开始处理所有榜单数据")
-            if not (charts := self.service_map['chart'].parse_local_chartlist()):
+            # 榜单条目按唯一键upsert，缺少唯一键时直接失败，避免静默写入重复条目
+            self.chart_entry_service.ensure_unique_key()
+            if not (charts := self.chart_service.parse_local_chartlist()):
                 logger.warning("未找到任何榜单数据")
                 return
 
             logger.info(f"找到 {len(charts)} 个榜单")
+            self._run_movies.clear()
+            self._failed_path = LogConfig().get_log_directory() / f"failed_entries_{datetime.now():%Y%m%d_%H%M%S}.jsonl"
+            self._current_chart_type = self._resolve_chart_type_once()
+            self._load_jellyfin_index()
             for chart in charts:
                 self._process_chart(chart)
             logger.info("所有榜单处理完成")
         except Exception as e:
             logger.error(f"榜单处理全局错误: {str(e)}")
             raise
+        finally:
+            session.expire_on_commit = expire_on_commit
+            self._current_chart_type = None
+            self._jellyfin_index = None
+            # 缓存只在一次运行内有效，下次运行时会话可能已关闭、数据可能已被其他进程修改
+            self._entity_cache.clear()
+            self._missing_keys.clear()
+            self._run_movies.clear()
+            self._close_failed_log()
+
+    def _load_jellyfin_index(self):
+        """一次请求取回Jellyfin库所有电影名，之后按番号在内存中判断；失败时回退为逐部查询"""
+        try:
+            names = self.jellyfin_service.get_all_movie_names()
+            self._jellyfin_index = '\n'.join(name.upper() for name in names)
+            logger.info(f"已加载Jellyfin库电影名: {len(names)} 部")
+        except Exception as e:
+            logger.warning(f"加载Jellyfin库失败，改为逐部查询: {str(e)}")
+            self._jellyfin_index = None
+
+    def _in_jellyfin(self, serial_number: str) -> bool:
+        """番号是否已在Jellyfin库中：电影名中以完整番号出现即视为存在，ABC-12不匹配ABC-123"""
+        if self._jellyfin_index is not None:
+            pattern = rf'(?<![A-Z0-9]){re.escape(serial_number.upper())}(?![0-9])'
+            return re.search(pattern, self._jellyfin_index) is not None
+        return self.jellyfin_service.check_movie_exists(title=serial_number)
+
+    def _resolve_chart_type_once(self) -> ChartType:
+        """获取或创建榜单类型，整个运行期间只查询一次"""
+        return (
+                self.chart_type_service.get_current_chart_type() or
+                self.chart_type_service.create(ChartType())
+        )
 
     def _process_chart(self, chart: Chart):
-        """处理单个榜单数据"""
+        """处理单个榜单数据：网络抓取在线程池中并发执行，数据库写入在当前线程串行执行"""
         logger.info(f"开始处理榜单: {chart.name}")
 
-        chart_entries = list(chart.entries)
-        logger.info(f"榜单 '{chart.name}' 共有 {len(chart_entries)} 个条目")
-        for entry in chart_entries:
-            try:
-                if entry.serial_number and entry.serial_number.startswith('FC2'):
-                    logger.info(f"跳过FC2类型条目: {entry.serial_number}")
-                    continue
-
-                logger.debug(f"处理条目: {entry.serial_number},排行: {entry.rank}")
-                if movie := self._fetch_and_process_movie(entry):
-                    self._save_chart_entry(entry, movie, chart.name)
-                    logger.info(f"成功处理并保存条目: {entry.serial_number}")
-                else:
-                    logger.warning(f"无法处理条目: {entry.serial_number}")
+        chart_entries = []
+        for entry in chart.entries:
+            if entry.serial_number and entry.serial_number.startswith('FC2'):
+                logger.info(f"跳过FC2类型条目: {entry.serial_number}")
+                continue
+            chart_entries.append(entry)
+        logger.info(f"榜单 '{chart.name}' 共有 {len(chart_entries)} 个条目，抓取线程数: {self.scrape_workers}")
 
-                time.sleep(random.randint(1, 5))
-            except Exception as e:
-                logger.error(f"处理榜单 '{chart.name}' 时出错: {str(e)}")
+        try:
+            # 不刷新已有电影时，抓取前先一次查询判断哪些电影已在库，据此跳过抓取；只需电影本身，不加载关联
+            if not self.refresh_existing:
+                self._prefetch_existing_movies(chart_entries, with_relations=False)
+
+            # 先并发抓取整个榜单，再一次性按类型预取所有关联实体
+            with ThreadPoolExecutor(max_workers=self.scrape_workers) as executor:
+                futures = [executor.submit(self._fetch_entry_movie, entry) for entry in chart_entries]
+                try:
+                    fetched = [future.result() for future in futures]
+                except ProxyExhaustedError:
+                    # 代理全部被禁：取消尚未开始的抓取，不再逐个请求剩余条目
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            # 整个榜单一个事务，每个条目一个保存点，单条失败只回滚该条目；
+            # 关闭autoflush，关联实体查询不再触发半成品电影的提前flush，改由保存点和DAO显式flush
+            saved: List[Tuple[ChartEntry, Movie]] = []
+            with batch_write(db.session) as session, session.no_autoflush:
+                self._prefetch_chart_entities([movie_info for movie_info, _ in fetched if movie_info])
+                # 刷新已有电影时要对比关联实体，只为实际抓取到的条目加载电影及其关联
+                if self.refresh_existing:
+                    self._prefetch_existing_movies(
+                        [entry for entry, (movie_info, _) in zip(chart_entries, fetched) if movie_info])
+                for entry, (movie_info, reason) in zip(chart_entries, fetched):
+                    if not movie_info and not self._get_known_movie(entry):
+                        logger.warning(f"无法处理条目: {entry.serial_number}")
+                        self._add_failed_entry(entry, chart.name, reason)
+                        continue
+                    try:
+                        with session.begin_nested():
+                            movie = self._persist_movie(entry, movie_info, chart.name)
+                    except Exception as e:
+                        logger.error(f"处理榜单 '{chart.name}' 时出错: {str(e)}")
+                        self._add_failed_entry(entry, chart.name, str(e))
+                        self._evict_unsaved_entities()
+                        continue
+                    # 保存点已释放，电影确定落库后才登记榜单条目
+                    if movie:
+                        saved.append((entry, movie))
+
+                # 所有条目合并为一条多行upsert，榜单只获取或创建一次
+                self._save_chart_entries(chart.name, saved)
+        except ProxyExhaustedError:
+            # 无可用代理时后续榜单同样无法抓取，停止整个运行
+            raise
+        except Exception as e:
+            # 整个榜单已回滚：记录该榜单其余条目为失败（已单独记录过的条目不重复记录），继续处理下一个榜单
+            logger.error(f"处理榜单 '{chart.name}' 失败，已回滚，继续处理下一个榜单: {str(e)}")
+            db.session.rollback()
+            self._evict_unsaved_entities()
+            for entry in chart_entries:
+                if (entry.serial_number or '').upper() not in self._chart_failed_serials:
+                    self._add_failed_entry(entry, chart.name, f"榜单整体回滚: {str(e)}")
+            return
+        finally:
+            self._chart_existing_movies = {}
+            self._chart_failed_serials = set()
         logger.info(f"榜单 '{chart.name}' 处理完成")
 
+    def _fetch_entry_movie(self, entry: ChartEntry) -> Tuple[Optional[Movie], Optional[str]]:
+        """
+        在工作线程中抓取并解析条目对应的电影，不访问数据库
+
+        Returns:
+            (电影信息, None)，失败时为 (None, 失败原因)
+        """
+        if self._get_known_movie(entry):
+            logger.info(f"本次运行已处理过或已在库，跳过抓取: {entry.serial_number}")
+            return None, None
+
+        try:
+            logger.debug(f"处理条目: {entry.serial_number},排行: {entry.rank}")
+            movie_info = self._fetch_and_process_movie(entry)
+            return movie_info, None if movie_info else '无法获取电影信息'
+        except ProxyExhaustedError:
+            raise
+        except Exception as e:
+            logger.error(f"抓取条目 {entry.serial_number} 时出错: {str(e)}")
+            return None, str(e)
+
+    def _persist_movie(self, entry: ChartEntry, movie_info: Movie, chart_name: str) -> Optional[Movie]:
+        """保存条目对应的电影，必须在持有数据库会话的线程中调用"""
+        run_key = (entry.serial_number or '').upper()
+        if movie := self._get_known_movie(entry) or self._save_movie(entry, movie_info):
+            self._run_movies[run_key] = movie
+            logger.info(f"成功处理并保存条目: {entry.serial_number}")
+            return movie
+
+        logger.warning(f"无法处理条目: {entry.serial_number}")
+        self._add_failed_entry(entry, chart_name, '无法保存电影信息')
+        return None
+
+    def _get_known_movie(self, entry: ChartEntry) -> Optional[Movie]:
+        """无需抓取即可使用的电影：本次运行已入库的，或不刷新已有电影时库中已存在的"""
+        key = (entry.serial_number or '').upper()
+        if movie := self._run_movies.get(key):
+            return movie
+        return None if self.refresh_existing else self._chart_existing_movies.get(key)
+
+    def _evict_unsaved_entities(self):
+        """事务回滚后剔除缓存中未落库的实体，避免后续条目引用已失效的对象"""
+        self._entity_cache = {
+            key: entity for key, entity in self._entity_cache.items()
+            if inspect(entity).persistent
+        }
+        self._run_movies = {
+            key: movie for key, movie in self._run_movies.items()
+            if inspect(movie).persistent
+        }
+
+    def _add_failed_entry(self, entry: ChartEntry, chart_name: str, reason: str):
+        """追加一条失败记录，立即落盘，进程中断也不丢失"""
+        self._chart_failed_serials.add((entry.serial_number or '').upper())
+        if self._failed_path is None:
+            return
+        try:
+            if self._failed_fp is None:
+                self._failed_path.parent.mkdir(parents=True, exist_ok=True)
+                self._failed_fp = self._failed_path.open('a', encoding='utf-8')
+                logger.info(f"失败条目记录文件: {self._failed_path}")
+
+            record = FailedEntry(entry.serial_number, chart_name, reason,
+                                 datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            self._failed_fp.write(JsonUtil.dumps(asdict(record)) + "\n")
+            self._failed_fp.flush()
+        except OSError as e:
+            logger.error(f"写入失败条目记录出错: {str(e)}")
+
+    def _close_failed_log(self):
+        """关闭失败记录文件"""
+        if self._failed_fp is not None:
+            self._failed_fp.close()
+        self._failed_fp = None
+        self._failed_path = None
+
 
     def _fetch_and_process_movie(self, entry: ChartEntry) -> Optional[Movie]:
-        """获取并处理电影信息"""
+        """获取电影信息并处理下载状态（仅网络请求，可在工作线程中执行）"""
         logger.info(f"开始获取电影信息: {entry.serial_number}")
 
         if not (movie_info := self._fetch_movie_info(entry)):
@@ -107,7 +348,10 @@ class ScraperService:
         # 处理下载状态
         movie_info.download_status = self._process_movie_download(movie=movie_info)
         logger.debug(f"电影信息详情: {movie_info.to_dict()}")
+        return movie_info
 
+    def _save_movie(self, entry: ChartEntry, movie_info: Movie) -> Optional[Movie]:
+        """新建或更新电影记录"""
         existing_movie = self._get_existing_movie(entry.serial_number)
         result = (
             self._update_movie(existing_movie, movie_info)
@@ -131,16 +375,18 @@ class ScraperService:
 
         if not (detail_page := self.http_util.request(url=detail_url)):
             logger.warning(f"获取电影详情页失败: {detail_url}")
+            # 缓存的URI可能已失效，删除后下次运行重新搜索
+            self._drop_cached_detail_uri(entry.serial_number)
             return None
 
-        movie_details = self.parser.parse_movie_details_page(detail_page)
+        if not (movie_details := self.parser.parse_movie_details_page(detail_page)):
+            logger.warning(f"解析电影详情页失败: {detail_url}")
+            self._drop_cached_detail_uri(entry.serial_number)
+            return None
 
         if movie_details.serial_number and movie_details.serial_number.startswith('FC2'):
             logger.info(f"跳过FC2类型条目: {movie_details.serial_number}")
             return None
-
-        if not movie_details:
-            logger.warning(f"解析电影详情页失败: {detail_url}")
         return movie_details
 
     def _get_movie_detail_page_url(self, entry: ChartEntry) -> str:
@@ -151,8 +397,16 @@ class ScraperService:
             logger.debug(f"使用预设URI: {entry.uri}")
             return entry.uri
 
+        if uri := self._get_cached_detail_uri(entry.serial_number):
+            logger.debug(f"使用缓存的详情页URI: {uri}")
+            return uri
+
+        if self._is_known_search_miss(entry.serial_number):
+            logger.info(f"近期搜索无结果，跳过搜索: {entry.serial_number}")
+            return None
+
         # 没有地址要去搜索
-        search_url = f'{self.base_url}/search?q={entry.serial_number}&f=all'
+        search_url = self._search_url_prefix + entry.serial_number + '&f=all'
         logger.debug(f"搜索URL: {search_url}")
 
         if not (search_page := self.http_util.request(url=search_url)):
@@ -162,32 +416,78 @@ class ScraperService:
         if not (search_results := self.parser.parse_search_results(search_page)):
             logger.warning(f"搜索结果解析失败: {search_url}")
             # raise Exception(f"搜索失败，查找不到: {entry.serial_number}")
+            self._record_search_miss(entry.serial_number)
             return None
 
         # 搜索结果判断逻辑
         if entry.serial_number.lower() != search_results[0].serial_number.lower():
             logger.warn(f"搜索失败，查找到: '{search_results[0].serial_number}'，但输入为: '{entry.serial_number}'")
 
-        if entry.serial_number and entry.serial_number.startswith('FC2'):
+        # 搜索结果已带番号，命中FC2时直接放弃，不再请求详情页
+        if search_results[0].serial_number and search_results[0].serial_number.upper().startswith('FC2'):
             raise Exception(f"搜索失败，查找到FC2: '{search_results[0].serial_number}'，但输入为:'{entry.serial_number}'")
         uri = search_results[0].uri
         logger.debug(f"找到搜索结果URI: {uri}")
+        if uri and entry.serial_number.lower() == search_results[0].serial_number.lower():
+            self._cache_detail_uri(entry.serial_number, uri)
         return uri
 
+    def _get_cached_detail_uri(self, serial_number: str) -> Optional[str]:
+        """读取番号对应的详情页URI缓存，Redis不可用时视为未命中"""
+        try:
+            cached = self.cache_service.get(SERIAL_URI_KEY_PREFIX + serial_number.upper())
+            return cached.get('uri') if isinstance(cached, dict) else None
+        except redis.RedisError as e:
+            logger.warning(f"读取详情页URI缓存失败: {str(e)}")
+            return None
+
+    def _is_known_search_miss(self, serial_number: str) -> bool:
+        """番号是否在有效期内搜索无结果，Redis不可用时视为未命中"""
+        try:
+            return bool(self.cache_service.exists(SEARCH_MISS_KEY_PREFIX + serial_number.upper()))
+        except redis.RedisError as e:
+            logger.warning(f"读取搜索未命中缓存失败: {str(e)}")
+            return False
+
+    def _record_search_miss(self, serial_number: str):
+        """记录搜索无结果的番号及时间"""
+        try:
+            self.cache_service.set(SEARCH_MISS_KEY_PREFIX + serial_number.upper(),
+                                   {'checked_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')},
+                                   self.search_miss_ttl)
+        except redis.RedisError as e:
+            logger.warning(f"写入搜索未命中缓存失败: {str(e)}")
+
+    def _cache_detail_uri(self, serial_number: str, uri: str):
+        """只缓存番号完全匹配的搜索结果，带过期时间，过期后重新搜索"""
+        try:
+            self.cache_service.set(SERIAL_URI_KEY_PREFIX + serial_number.upper(), {'uri': uri},
+                                   self.serial_uri_ttl)
+        except redis.RedisError as e:
+            logger.warning(f"写入详情页URI缓存失败: {str(e)}")
+
+    def _drop_cached_detail_uri(self, serial_number: str):
+        """删除番号对应的详情页URI缓存"""
+        try:
+            self.cache_service.delete(SERIAL_URI_KEY_PREFIX + serial_number.upper())
+        except redis.RedisError as e:
+            logger.warning(f"删除详情页URI缓存失败: {str(e)}")
+
+    def _prefetch_existing_movies(self, entries: List[ChartEntry], with_relations: bool = True):
+        """一次IN查询加载本榜单所有已在库的电影，未找到的番号记为None"""
+        serial_numbers = [entry.serial_number.upper() for entry in entries if entry.serial_number]
+        existing = (self.movie_service.get_movies_with_relations(serial_numbers) if with_relations
+                    else self.movie_service.get_movies_by_serial_numbers(serial_numbers))
+        self._chart_existing_movies = {serial: existing.get(serial) for serial in serial_numbers}
+        logger.debug(f"批量加载已有电影: 请求 {len(serial_numbers)} 个，命中 {len(existing)} 个")
+
     def _get_existing_movie(self, serial_number: str) -> Optional[Movie]:
-        """从数据库获取已存在的电影信息"""
+        """从数据库获取已存在的电影信息，优先使用榜单级批量加载结果"""
+        key = serial_number.upper()
+        if key in self._chart_existing_movies:
+            return self._chart_existing_movies[key]
         logger.debug(f"查询电影是否已存在: {serial_number}")
-        return self.service_map['movie'].get_movie_from_db_by_serial_number(
-            serial_number,
-            options=[
-                joinedload(Movie.studio),
-                joinedload(Movie.actors),
-                joinedload(Movie.directors),
-                joinedload(Movie.seriess),
-                joinedload(Movie.genres),
-                joinedload(Movie.labels)
-            ]
-        )
+        return self.movie_service.get_movie_with_relations(serial_number)
 
     def _create_new_movie(self, movie: Movie) -> Optional[Movie]:
         """创建新电影记录"""
@@ -196,35 +496,98 @@ class ScraperService:
         logger.debug(f"创建前电影信息详情: {movie.to_dict()}")
 
         try:
-            new_movie = self.service_map['movie'].create(movie)
+            # 独立保存点：唯一键冲突只回滚本次插入，后续查询仍可在当前事务中进行
+            with db.session.begin_nested():
+                new_movie = self.movie_service.create(movie)
             logger.info(f"新电影记录创建成功: {new_movie.serial_number}")
             return new_movie
         except IntegrityError:
             logger.warning(f"创建电影记录时遇到完整性错误，尝试获取已存在记录: {movie.serial_number}")
-            return self.service_map['movie'].get_movie_from_db_by_serial_number(
+            return self.movie_service.get_movie_from_db_by_serial_number(
                 movie.serial_number)
 
-    def _clean_entity_relationships(self, entity) -> None:
-        """清理实体的关系属性，避免级联创建"""
-        try:
-            # 获取实体的所有属性
-            relationships = ['movies', 'actors', 'directors', 'genres', 'labels', 'seriess']
-            for rel in relationships:
-                if hasattr(entity, rel):
-                    setattr(entity, rel, [])
-        except Exception as e:
-            logger.error(f"清理实体关系时出错: {str(e)}")
+    @staticmethod
+    def _new_entity(entity):
+        """
+        按解析实体已赋值的列构造一个新实体用于插入，不带任何关联
+
+        解析出的实体通过反向引用（如 actor.movies）关联着解析出的电影，清空这些集合会把实体
+        从电影的关联列表中移除，因此只能复制列值，不能修改原对象
+        """
+        loaded = instance_dict(entity)
+        return type(entity)(**{attr.key: loaded[attr.key] for attr in inspect(type(entity)).column_attrs
+                               if attr.key != 'id' and attr.key in loaded})
+
+    @staticmethod
+    def _cache_key(service_key: str, name: str) -> Tuple[str, str]:
+        """缓存键按去空白、小写归一化，与数据库utf8mb4_unicode_ci的比较规则一致"""
+        return service_key, (name or '').strip().lower()
+
+    def _prefetch_chart_entities(self, movies: List[Movie]):
+        """汇总整个榜单出现的关联实体，每种类型一次IN查询预热缓存，并批量创建缺失的实体（磁力除外）"""
+        studios = [movie.studio for movie in movies]
+        self._prefetch_entities(studios, 'studio')
+        self._bulk_create_missing(studios, 'studio')
+        for attr, service_key in self._RELATION_MAP.items():
+            entities = [entity for movie in movies for entity in getattr(movie, attr)]
+            self._prefetch_entities(entities, service_key)
+            if service_key not in self._OWNED_SERVICE_KEYS:
+                self._bulk_create_missing(entities, service_key)
+
+    def _bulk_create_missing(self, entities: List[Any], service_key: str):
+        """预取确认不存在的实体一次批量插入，再一次IN查询取回带主键的对象放入缓存"""
+        pending = {}
+        for entity in entities:
+            if entity and entity.name and (key := self._cache_key(service_key, entity.name)) in self._missing_keys:
+                pending.setdefault(key, entity)
+        if not pending:
+            return
+
+        # 插入新构造的对象：解析出的实体仍挂在电影的关联列表中，不能修改
+        self.service_map[service_key].batch_create([self._new_entity(entity) for entity in pending.values()])
+        self._missing_keys.difference_update(pending)
+        self._prefetch_entities(list(pending.values()), service_key)
+        logger.debug(f"批量创建 {service_key}: {len(pending)} 个")
+
+    def _prefetch_entities(self, entities: List[Any], service_key: str):
+        """批量查询同类实体，一次IN查询预热缓存，避免逐个get_by_name"""
+        names = {e.name: self._cache_key(service_key, e.name) for e in entities if e and e.name}
+        names = {name: key for name, key in names.items()
+                 if key not in self._entity_cache and key not in self._missing_keys}
+        if not names:
+            return
+
+        existing = self.service_map[service_key].get_by_names(list(names))
+        logger.debug(f"批量预取 {service_key}: 请求 {len(names)} 个，命中 {len(existing)} 个")
+        for name, db_entity in existing.items():
+            self._entity_cache[self._cache_key(service_key, name)] = db_entity
+        self._missing_keys.update(key for key in names.values() if key not in self._entity_cache)
 
     def _get_or_create_entity(self, entity, service_key: str):
-        """获取或创建实体，确保清理关系"""
+        """获取或创建实体，创建时插入新构造的对象，解析出的实体保持不变"""
         if not entity:
             return None
 
-        self._clean_entity_relationships(entity)
-        return (
-                self.service_map[service_key].get_by_name(entity.name) or
-                self.service_map[service_key].create(entity)
-        )
+        cache_key = self._cache_key(service_key, entity.name)
+        if cached := self._entity_cache.get(cache_key):
+            return cached
+
+        service = self.service_map[service_key]
+        if service_key in self._OWNED_SERVICE_KEYS:
+            # 新磁力只构造对象挂到电影上，随电影flush时由关联填充mid，不能先以默认mid插入
+            if cache_key not in self._missing_keys and (db_entity := service.get_by_name(entity.name)):
+                self._entity_cache[cache_key] = db_entity
+                return db_entity
+            return self._new_entity(entity)
+        if cache_key in self._missing_keys:
+            # 预取已确认不存在，直接创建
+            self._missing_keys.discard(cache_key)
+            db_entity = service.create(self._new_entity(entity))
+        else:
+            db_entity = service.get_by_name(entity.name) or service.create(self._new_entity(entity))
+        if db_entity:
+            self._entity_cache[cache_key] = db_entity
+        return db_entity
 
     def _process_all_relations(self, movie: Movie):
         """处理所有关联实体，避免级联创建"""
@@ -233,103 +596,95 @@ class ScraperService:
             movie.studio = self._get_or_create_entity(studio, 'studio')
 
         # 处理多对多关系
-        relation_map = {
-            'actors': 'actor',
-            'directors': 'director',
-            'seriess': 'series',
-            'genres': 'genre',
-            'labels': 'label',
-            'magnets': 'magnet'
-        }
+        for attr, service_key in self._RELATION_MAP.items():
+            entities = getattr(movie, attr)
+            self._prefetch_entities(entities, service_key)
 
-        for attr, service_key in relation_map.items():
-            if not hasattr(movie, attr):
-                continue
-
-            new_entities = []
-            for entity in getattr(movie, attr, []):
+            # 页面上同名实体可能重复出现，按缓存键去重，避免重复写入关联表
+            resolved = {}
+            for entity in entities:
                 if db_entity := self._get_or_create_entity(entity, service_key):
-                    new_entities.append(db_entity)
-            setattr(movie, attr, new_entities)
+                    resolved.setdefault(self._cache_key(service_key, db_entity.name), db_entity)
+            setattr(movie, attr, list(resolved.values()))
 
     def _update_movie(self, existing: Movie, new: Movie) -> Movie:
-        """更新已存在的电影信息"""
-        # 更新基础字段
-        basic_fields = [
-            'name', 'title', 'pic_cover', 'release_date', 'length',
-            'have_mg', 'have_file', 'have_hd', 'have_sub'
-        ]
-        for field in basic_fields:
-            if value := getattr(new, field, None):
-                setattr(existing, field, value)
+        """更新已存在的电影信息，只写入有变化的字段，无变化时跳过更新"""
+        # 更新基础字段：只赋值真正变化的列，UPDATE语句只包含这些列
+        changed = {field: value
+                   for field, value, current in zip(self._BASIC_FIELDS, self._get_basic_fields(new),
+                                                    self._get_basic_fields(existing))
+                   if value and value != current}
+        for field, value in changed.items():
+            setattr(existing, field, value)
 
         # 更新关联实体
-        self._update_relations(existing, new)
-        return self.service_map['movie'].update(existing)
-
-    def _update_relations(self, existing: Movie, new: Movie):
-        """更新电影的关联实体"""
+        relations_changed = self._update_relations(existing, new)
+        if not changed and not relations_changed:
+            logger.debug(f"电影信息无变化，跳过更新: {existing.serial_number}")
+            return existing
+        return self.movie_service.update(existing)
+
+    def _update_relations(self, existing: Movie, new: Movie) -> bool:
+        """更新电影的关联实体，返回是否有变化"""
+        changed = False
         # 更新制片商
         if new_studio := getattr(new, 'studio', None):
-            existing.studio = self._get_or_create_entity(new_studio, 'studio')
+            studio = self._get_or_create_entity(new_studio, 'studio')
+            if studio is not existing.studio:
+                existing.studio = studio
+                changed = True
 
         # 更新多对多关系
-        relation_map = {
-            'actors': 'actor',
-            'directors': 'director',
-            'seriess': 'series',
-            'genres': 'genre',
-            'labels': 'label',
-            'magnets': 'magnet'
-        }
+        for attr, service_key in self._RELATION_MAP.items():
+            existing_entities = getattr(existing, attr)
+            existing_by_key = {self._cache_key(service_key, e.name): e for e in existing_entities}
 
-        for attr, service_key in relation_map.items():
-            if not hasattr(new, attr):
-                continue
+            new_entities = [e for e in getattr(new, attr)
+                            if self._cache_key(service_key, e.name) not in existing_by_key]
+            self._prefetch_entities(new_entities, service_key)
 
-            existing_entities = getattr(existing, attr)
-            existing_names = {e.name for e in existing_entities}
+            for new_entity in new_entities:
+                key = self._cache_key(service_key, new_entity.name)
+                # 同一页面内重复出现的实体只追加一次
+                if key in existing_by_key:
+                    continue
+                if db_entity := self._get_or_create_entity(new_entity, service_key):
+                    existing_by_key[key] = db_entity
+                    existing_entities.append(db_entity)
+                    changed = True
+        return changed
 
-            for new_entity in getattr(new, attr, []):
-                if new_entity.name not in existing_names:
-                    if db_entity := self._get_or_create_entity(new_entity, service_key):
-                        existing_entities.append(db_entity)
+    def _save_chart_entries(self, chart_name: str, saved: List[Tuple[ChartEntry, Movie]]):
+        """保存榜单条目：榜单只获取或创建一次，所有条目一条多行SQL插入或更新"""
+        if not saved:
+            return
 
-    def _save_chart_entry(self, entry: ChartEntry, movie: Movie, chart_name: str):
-        """保存榜单条目"""
         # 获取或创建榜单类型
-        chart_type = (
-                self.service_map['chart_type'].get_current_chart_type() or
-                self.service_map['chart_type'].create(ChartType())
-        )
+        chart_type = self._current_chart_type or self._resolve_chart_type_once()
 
         # 获取或创建榜单
         chart = Chart(name=chart_name, chart_type=chart_type)
         db_chart = (
-                self.service_map['chart'].get_by_name(chart_name) or
-                self.service_map['chart'].create(chart)
+                self.chart_service.get_by_name(chart_name) or
+                self.chart_service.create(chart)
         )
 
-        # 创建条目（如果不存在）
-        if not (existing_entry := self.service_map['chart_entry'].get_by_chart_and_movie(db_chart.id, movie.id)):
-            entry.movie = movie
-            entry.chart = db_chart
-            self.service_map['chart_entry'].create(entry)
-        else:
-            if not existing_entry.movie or existing_entry.movie.id != movie.id:
-                existing_entry.movie = movie
-                self.chart_entry_service.update(existing_entry)
+        self.chart_entry_service.upsert_many([
+            self.chart_entry_service.build_upsert_values(entry, chart_id=db_chart.id, movie_id=movie.id)
+            for entry, movie in saved
+        ])
+        logger.info(f"榜单 '{chart_name}' 保存 {len(saved)} 个条目")
 
     def _process_movie_download(self, movie: Movie) -> int:
         """处理电影下载状态"""
         try:
             logger.debug(f"开始处理电影下载状态: {movie.serial_number}")
 
-            if self.service_map['jellyfin'].check_movie_exists(title=movie.serial_number):
+            if self._in_jellyfin(movie.serial_number):
                 logger.info(f"电影已存在于Jellyfin库: {movie.serial_number}")
                 return DownloadStatus.IN_LIBRARY.value
 
-            elif self.service_map['everything'].local_exists_movie(movie.serial_number):
+            elif self.everything_service.local_exists_movie(movie.serial_number):
                 logger.info(f"本地已存在电影: {movie.serial_number}")
                 return DownloadStatus.COMPLETED.value
 
@@ -337,20 +692,20 @@ class ScraperService:
                 logger.warning(f"电影无可用磁力链接: {movie.serial_number}")
                 return DownloadStatus.NO_SOURCE.value
 
-            status = self.service_map['download'].get_download_status(movie.serial_number)
+            status = self.download_service.get_download_status(movie.serial_number)
             logger.debug(f"当前下载状态: {status}")
 
             # 已完成状态直接返回
-            if status in [DownloadStatus.COMPLETED.value, DownloadStatus.IN_LIBRARY.value]:
+            if status in DOWNLOAD_DONE_STATUSES:
                 logger.info(f"电影下载状态已完成: {movie.serial_number}")
                 return status
 
             # 添加下载任务
             magnet = movie.magnets[0]
-            magnet_link = f"magnet:?xt=urn:btih:{magnet.magnet_xt}"
+            magnet_link = MAGNET_URI_PREFIX + magnet.magnet_xt
             logger.info(f"准备添加下载任务: {magnet_link}")
 
-            if self.service_map['download'].add_download(magnet_link):
+            if self.download_service.add_download(magnet_link):
                 logger.info(f"下载任务添加成功: {movie.serial_number}")
                 return DownloadStatus.DOWNLOADING.value
 
@@ -1,4 +1,6 @@
 # app/utils/db_util.py
+from contextlib import contextmanager
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from app.config.app_config import AppConfig
@@ -14,12 +16,35 @@ def init_app(app: Flask):
         'SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['dbname']}"
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SQLALCHEMY_ECHO'] = db_config.get('echo', False)
-    app.config['SQLALCHEMY_POOL_SIZE'] = db_config.get('pool_size', 5)
-    app.config['SQLALCHEMY_MAX_OVERFLOW'] = db_config.get('max_overflow', 10)
-    app.config['SQLALCHEMY_POOL_RECYCLE'] = db_config.get('pool_recycle', 3600)
+    # Flask-SQLAlchemy 3.x 不再识别 SQLALCHEMY_POOL_* 配置项，连接池参数统一通过引擎选项传入
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': db_config.get('pool_size', 5),
+        'max_overflow': db_config.get('max_overflow', 10),
+        'pool_recycle': db_config.get('pool_recycle', 3600),
+        'pool_pre_ping': db_config.get('pool_pre_ping', True),
+    }
 
     db.init_app(app)
 
 
 def get_db():
     return db
+
+
+@contextmanager
+def batch_write(session=None):
+    """
+    批量写入事务：上下文内DAO的写操作只flush不commit，正常退出时统一提交一次，异常时整体回滚
+
+    需要单条失败不影响整批时，在上下文内配合 session.begin_nested() 使用保存点
+    """
+    session = session or db.session
+    session.info['batch_write'] = True
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop('batch_write', None)
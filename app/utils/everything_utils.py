@@ -1,3 +1,5 @@
+import threading
+
 from everytools import EveryTools
 from typing import List, Optional
 import logging
@@ -12,6 +14,8 @@ class EverythingUtils:
     """
 
     _instance = None
+    # 单例共享一个EveryTools，search_xxx与results()是两次独立调用，多线程并发时结果会串，需串行执行
+    _search_lock = threading.Lock()
 
     def __new__(cls):
         """
@@ -108,30 +112,31 @@ class EverythingUtils:
             if len(file_extensions.strip()):
                 query += f' ext:{"|".join(file_extensions)}'
 
-            if search_type == SearchType.AUDIO:
-                self.es.search_audio(query)
-            elif search_type == SearchType.ZIP:
-                self.es.search_zip(query)
-            elif search_type == SearchType.DOC:
-                self.es.search_doc(query)
-            elif search_type == SearchType.EXE:
-                self.es.search_exe(query)
-            elif search_type == SearchType.FOLDER:
-                self.es.search_folder(query)
-            elif search_type == SearchType.PIC:
-                self.es.search_pic(query)
-            elif search_type == SearchType.VIDEO:
-                self.es.search_video(query)
-            elif search_type == SearchType.CUSTOM_EXT:
-                ext = kwargs.get('ext', '')
-                self.es.search_ext(query, ext=ext)
-            elif search_type == SearchType.CUSTOM_LOCATION:
-                location = kwargs.get('location', '')
-                self.es.search_in_located(query, location)
-            else:
-                self.es.search(query)
-
-            results = self.es.results()
+            with self._search_lock:
+                if search_type == SearchType.AUDIO:
+                    self.es.search_audio(query)
+                elif search_type == SearchType.ZIP:
+                    self.es.search_zip(query)
+                elif search_type == SearchType.DOC:
+                    self.es.search_doc(query)
+                elif search_type == SearchType.EXE:
+                    self.es.search_exe(query)
+                elif search_type == SearchType.FOLDER:
+                    self.es.search_folder(query)
+                elif search_type == SearchType.PIC:
+                    self.es.search_pic(query)
+                elif search_type == SearchType.VIDEO:
+                    self.es.search_video(query)
+                elif search_type == SearchType.CUSTOM_EXT:
+                    ext = kwargs.get('ext', '')
+                    self.es.search_ext(query, ext=ext)
+                elif search_type == SearchType.CUSTOM_LOCATION:
+                    location = kwargs.get('location', '')
+                    self.es.search_in_located(query, location)
+                else:
+                    self.es.search(query)
+
+                results = self.es.results()
             self.logger.info(f"搜索 '{query}' 完成，类型：{search_type.value}，找到 {len(results)} 个结果。")
 
             return results
@@ -1,7 +1,10 @@
-import sys
+import threading
 from enum import Enum
 
+import redis
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from requests.exceptions import RequestException
 import time
 import random
@@ -10,6 +13,8 @@ from typing import Optional, Dict, List
 
 from app.config.app_config import AppConfig
 from app.config.log_config import debug, info, warning, error, critical
+from app.services.cache_service import CacheService
+from app.utils.rate_limit_util import RateLimiter
 """"""
 import os
 from datetime import datetime, timedelta
@@ -17,6 +22,17 @@ from datetime import datetime, timedelta
 os.environ["http_proxy"] = "http://127.0.0.1:7890"
 os.environ["https_proxy"] = "http://127.0.0.1:7890"
 
+# 封禁页提示文字；只取撇号之前的部分，原始HTML中撇号可能被转义为实体
+BANNED_MARKER = "The owner of this website has banned your access based on your browser"
+# 页面缓存键前缀，与其他javdb缓存键保持同一命名方式
+PAGE_CACHE_KEY_PREFIX = 'javdb:page:'
+
+
+class ProxyExhaustedError(Exception):
+    """所有代理均已被封禁，继续请求没有意义，调用方应停止整个抓取"""
+    pass
+
+
 class ProxyRegion(Enum):
     AUSTRALIA = "Australia"
     USA = "UnitedStates"
@@ -32,6 +48,29 @@ class HttpUtil:
         self.timeout_seconds = self.scraper.get('timeout_seconds', 120)
         self.retry_attempts = self.scraper.get('retry_attempts', 3)
 
+        # 条件请求缓存：保存页面的ETag/Last-Modified和正文，未变化的页面只需一次304往返；
+        # 缓存的是完整HTML，默认关闭，需要时在配置中开启
+        self.http_cache_enabled = self.scraper.get('http_cache', False)
+        self.http_cache_ttl = self.scraper.get('http_cache_ttl', 24 * 3600)
+        # 新鲜期内的缓存页面直接返回，不再发请求；为0时每次都发条件请求
+        self.http_cache_fresh_seconds = self.scraper.get('http_cache_fresh_seconds', 0)
+        self._cache: Optional[CacheService] = None
+
+        # 复用连接（keep-alive），避免每次请求重新握手TCP/TLS；连接池不小于并发抓取线程数
+        scrape_workers = int(self.scraper.get('scrape_workers', 4))
+        pool_size = max(10, scrape_workers)
+        self.session = requests.Session()
+        # 连接级瞬时错误和5xx先由urllib3带退避重试，仍失败才进入下面的切换代理逻辑
+        retry = Retry(total=self.retry_attempts, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # 所有抓取线程共享的令牌桶，限制总请求速率；取代每个条目固定随机休眠
+        self.rate_limiter = RateLimiter(self.scraper.get('requests_per_minute', 30),
+                                        self.scraper.get('request_burst', scrape_workers))
+
         self.proxy_config = self.config.get_proxy_config()
 
         self.proxy_enabled = self.proxy_config.get('enable', True)
@@ -48,6 +87,9 @@ class HttpUtil:
 
         # 代理黑名单字典，记录被禁代理及禁止时间
         self.proxy_blacklist: Dict[str, datetime] = {}
+        # 多个抓取线程可能同时遇到封禁，切换代理需串行；每成功切换一次代次加一
+        self._proxy_lock = threading.Lock()
+        self._proxy_generation = 0
 
     def _get_base_url(self) -> str:
         return f'http://{self.proxy_host}:{self.proxy_api_port}'
@@ -115,23 +157,83 @@ class HttpUtil:
         response = requests.put(url, json=data, headers=self.proxy_headers)
         return response.status_code == 204
 
-    def change_proxy(self) -> bool:
-        """切换到最佳可用代理"""
-        # 标记当前代理为黑名单
-        current_proxy = self._get_selector_proxies()['now']
-        self.proxy_blacklist[current_proxy] = datetime.now()
+    def change_proxy(self, seen_generation: Optional[int] = None) -> bool:
+        """
+        切换到最佳可用代理
+
+        Args:
+            seen_generation: 调用方发出请求时的代理代次；若其他线程已在此之后切换过代理，
+                             直接返回True用新代理重试，不再拉黑刚切换上的代理
+        """
+        with self._proxy_lock:
+            if seen_generation is not None and seen_generation != self._proxy_generation:
+                return True
+
+            # 标记当前代理为黑名单
+            current_proxy = self._get_selector_proxies()['now']
+            self.proxy_blacklist[current_proxy] = datetime.now()
+
+            best_proxy = self.get_best_available_proxy()
+            if not best_proxy:
+                print("无可用代理")
+                return False
 
-        best_proxy = self.get_best_available_proxy()
-        if not best_proxy:
-            print("无可用代理")
-            return False
+            if self._switch_proxy(best_proxy):
+                self._proxy_generation += 1
+                print(f'成功切换到代理: {best_proxy}')
+                return True
+            else:
+                print(f'切换代理失败: {best_proxy}')
+                return False
 
-        if self._switch_proxy(best_proxy):
-            print(f'成功切换到代理: {best_proxy}')
-            return True
-        else:
-            print(f'切换代理失败: {best_proxy}')
-            return False
+    def _get_cache(self) -> Optional[CacheService]:
+        """页面缓存与其他缓存一样经CacheService读写，序列化统一走JsonUtil"""
+        if not self.http_cache_enabled:
+            return None
+        if self._cache is None:
+            self._cache = CacheService()
+        return self._cache
+
+    def _get_cached_response(self, url: str) -> Optional[Dict]:
+        """读取页面缓存，Redis不可用时视为未命中；早先缓存的封禁页直接删除"""
+        if not (cache := self._get_cache()):
+            return None
+        try:
+            cached = cache.get(PAGE_CACHE_KEY_PREFIX + url)
+            if not isinstance(cached, dict):
+                return None
+            if BANNED_MARKER in cached.get('body', ''):
+                cache.delete(PAGE_CACHE_KEY_PREFIX + url)
+                return None
+            return cached
+        except redis.RedisError as e:
+            warning(f"读取页面缓存失败: {e}")
+            return None
+
+    def _is_cache_fresh(self, cached: Dict) -> bool:
+        """缓存是否仍在新鲜期内，新鲜期内无需任何网络请求"""
+        return (self.http_cache_fresh_seconds > 0 and
+                time.time() - cached.get('cached_at', 0) < self.http_cache_fresh_seconds)
+
+    def _cache_response(self, url: str, response: requests.Response):
+        """缓存带校验头的响应；开启新鲜期时无校验头的响应也缓存；只缓存200且不是封禁页的响应"""
+        if not (cache := self._get_cache()):
+            return
+        if response.status_code != 200 or BANNED_MARKER in response.text:
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not (etag or last_modified or self.http_cache_fresh_seconds > 0):
+            return
+        try:
+            cache.set(PAGE_CACHE_KEY_PREFIX + url, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'cached_at': time.time(),
+                'body': response.text
+            }, self.http_cache_ttl)
+        except redis.RedisError as e:
+            warning(f"写入页面缓存失败: {e}")
 
     def request(self, url: str, proxy_enable: bool = True,
                 cookie: str = '', print_content: bool = False) -> Optional[BeautifulSoup]:
@@ -145,31 +247,45 @@ class HttpUtil:
         proxies = {'http': f'{self.proxy_host}:{self.proxy_port}',
                    'https': f'{self.proxy_host}:{self.proxy_port}'} if proxy_enable else None
 
+        cached = self._get_cached_response(url)
+        if cached and self._is_cache_fresh(cached):
+            debug(f"缓存在新鲜期内，不发请求: {url}")
+            return BeautifulSoup(cached['body'], 'lxml')
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
         while True:
+            generation = self._proxy_generation
             try:
-                response = requests.get(url=url, headers=headers, proxies=proxies, timeout=120)
+                self.rate_limiter.acquire()
+                response = self.session.get(url=url, headers=headers, proxies=proxies, timeout=120)
+                if response.status_code == 304 and cached:
+                    debug(f"页面未变化，使用缓存: {url}")
+                    return BeautifulSoup(cached['body'], 'lxml')
                 response.raise_for_status()
 
                 if print_content:
                     print(f"响应内容: {response.text}")
 
-                soup = BeautifulSoup(response.text, 'lxml')
-                banned = "The owner of this website has banned your access based on your browser's behaving"
-
-                if banned in soup.get_text("|", strip=True):
+                # 在原始HTML上检查封禁提示，无需先解析再遍历整棵DOM取文本；封禁页也不再解析
+                if BANNED_MARKER in response.text:
                     # 如果被禁，切换代理并重试
-                    proxy_change_success = self.change_proxy()
+                    proxy_change_success = self.change_proxy(generation)
                     if not proxy_change_success:
                         print("所有代理均已被禁，程序停止")
-                        #raise Exception(f"请求失败，URL: {url}")
-                        sys.exit(0)
+                        # 在抓取线程中不能sys.exit，抛出专用异常由调用方取消剩余任务
+                        raise ProxyExhaustedError(f"所有代理均已被禁，URL: {url}")
                     continue
 
-                return soup
+                self._cache_response(url, response)
+                return BeautifulSoup(response.text, 'lxml')
 
             except RequestException as e:
                 print(f"请求失败，错误: {e}")
-                proxy_change_success = self.change_proxy()
+                proxy_change_success = self.change_proxy(generation)
                 if not proxy_change_success:
                     print("无法切换到可用代理，程序停止")
                     return None
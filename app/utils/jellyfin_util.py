@@ -155,6 +155,25 @@ class JellyfinUtil(JellyfinUtilInterface):
         self.logger.info(f"成功获取到 {result.total_record_count} 部电影的信息")
         return result.items
 
+    def get_all_library_movie_info(self, user_id: str = '') -> List[Dict[str, Any]]:
+        """
+        获取所有库中的电影信息，范围与 search_by_serial_number 一致（不限定父库）。
+
+        :param user_id: 用户 ID
+        :return: 包含所有电影信息的列表
+        """
+        user_id, _ = self._get_default_user_id_and_item_id(user_id, item_id='')
+        self.logger.info(f"正在获取用户 {user_id} 所有库中的电影信息")
+        result = self.items_controller.get_items(
+            user_id=user_id,
+            include_item_types='Movie',
+            recursive=True,
+            enable_total_record_count=False,
+            limit=None
+        )
+        self.logger.info(f"成功获取到 {len(result.items)} 部电影的信息")
+        return result.items
+
     def get_movie_details(self, movie_id: str, user_id: str = '', item_id='') -> Dict[str, Any]:
         """
         获取指定电影的详细信息。
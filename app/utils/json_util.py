@@ -0,0 +1,31 @@
+# app/utils/json_util.py
+"""JSON序列化工具：优先使用orjson，未安装时回退到标准库json"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """无法直接序列化的值：日期时间与orjson一致输出ISO格式，其余（如Decimal）转为字符串"""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return str(obj)
+
+
+class JsonUtil:
+    @staticmethod
+    def dumps(obj) -> str:
+        """序列化为字符串，非ASCII字符原样输出；两种实现输出格式一致"""
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default)
+
+    @staticmethod
+    def loads(data):
+        """反序列化字符串或bytes"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
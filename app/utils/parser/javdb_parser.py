@@ -2,6 +2,7 @@ import re
 from datetime import datetime
 from typing import List, Tuple, Optional
 
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
 from app.model.db.movie_model import Movie, Director, Actor, Series, Genre, Studio, Magnet
@@ -10,6 +11,26 @@ from app.utils.parser.base_movie_parser import BaseMovieParser, ParserError
 from app.utils.parser.model.movie_search_result import MovieSearchResult
 from app.utils.parser.parser_factory import ParserFactory
 
+# 详情页CSS选择器在模块加载时编译一次，解析每个页面时直接复用
+_SEL_TITLE = sv.compile('.title.is-4')
+_SEL_PANEL_BLOCKS = sv.compile('.movie-panel-info .panel-block')
+_SEL_STRONG = sv.compile('strong')
+_SEL_VALUE = sv.compile('.value')
+_SEL_LINK = sv.compile('a')
+_SEL_ACTORS_BLOCK = sv.compile('.panel-block:-soup-contains("演員")')
+_SEL_DIRECTORS_BLOCK = sv.compile('.panel-block:-soup-contains("導演")')
+_SEL_GENRES_BLOCK = sv.compile('.panel-block:-soup-contains("類別")')
+_SEL_SERIES_BLOCK = sv.compile('.panel-block:-soup-contains("系列")')
+_SEL_STUDIO_BLOCK = sv.compile('.panel-block:-soup-contains("片商")')
+_SEL_USER_STATS = sv.compile('.video-meta-panel .is-size-7')
+_SEL_MAGNETS = sv.compile('.magnet-links .item')
+_SEL_MAGNET_NAME = sv.compile('.magnet-name a')
+_SEL_NAME = sv.compile('.name')
+_SEL_META = sv.compile('.meta')
+_SEL_TAG_HD = sv.compile('.tag.is-primary')
+_SEL_TAG_SUB = sv.compile('.tag.is-warning')
+_SEL_DATE = sv.compile('.date .time')
+
 
 @ParserFactory.register('javdb')
 class JavdbParser(BaseMovieParser):
@@ -43,7 +64,7 @@ class JavdbParser(BaseMovieParser):
             movie = Movie()
 
             # 解析标题信息
-            title_elem = soup.select_one('.title.is-4')
+            title_elem = _SEL_TITLE.select_one(soup)
             if title_elem:
                 # 获取番号和标题
                 title_parts = [text.strip() for text in title_elem.stripped_strings]
@@ -61,7 +82,7 @@ class JavdbParser(BaseMovieParser):
                     debug(f"解析到番号:{movie.serial_number}, 标题:{movie.title}, 名称:{movie.name}")
 
             # 解析面板信息
-            panel_blocks = soup.select('.movie-panel-info .panel-block')
+            panel_blocks = _SEL_PANEL_BLOCKS.select(soup)
             for block in panel_blocks:
                 self._parse_panel_block(block, movie)
 
@@ -102,8 +123,8 @@ class JavdbParser(BaseMovieParser):
     def _parse_panel_block(self, block: BeautifulSoup, movie: Movie):
         """解析面板块信息"""
         try:
-            label = self._safe_extract_text(block.select_one('strong'))
-            value = self._safe_extract_text(block.select_one('.value'))
+            label = self._safe_extract_text(_SEL_STRONG.select_one(block))
+            value = self._safe_extract_text(_SEL_VALUE.select_one(block))
 
             if '番號' in label:
                 movie.serial_number = value
@@ -138,9 +159,9 @@ class JavdbParser(BaseMovieParser):
     def _parse_actors(self, soup: BeautifulSoup, movie: Movie):
         """解析演员信息"""
         try:
-            actors_block = soup.select_one('.panel-block:contains("演員")')
+            actors_block = _SEL_ACTORS_BLOCK.select_one(soup)
             if actors_block:
-                actor_links = actors_block.select('a')
+                actor_links = _SEL_LINK.select(actors_block)
                 for actor_link in actor_links:
                     actor = Actor()
                     actor.name = actor_link.text.strip()
@@ -156,9 +177,9 @@ class JavdbParser(BaseMovieParser):
     def _parse_directors(self, soup: BeautifulSoup, movie: Movie):
         """解析导演信息"""
         try:
-            directors_block = soup.select_one('.panel-block:contains("導演")')
+            directors_block = _SEL_DIRECTORS_BLOCK.select_one(soup)
             if directors_block:
-                director_links = directors_block.select('a')
+                director_links = _SEL_LINK.select(directors_block)
                 for director_link in director_links:
                     director = Director()
                     director.name = director_link.text.strip()
@@ -170,9 +191,9 @@ class JavdbParser(BaseMovieParser):
     def _parse_genres(self, soup: BeautifulSoup, movie: Movie):
         """解析类别信息"""
         try:
-            genres_block = soup.select_one('.panel-block:contains("類別")')
+            genres_block = _SEL_GENRES_BLOCK.select_one(soup)
             if genres_block:
-                genre_links = genres_block.select('a')
+                genre_links = _SEL_LINK.select(genres_block)
                 for genre_link in genre_links:
                     genre = Genre()
                     genre.name = genre_link.text.strip()
@@ -189,9 +210,9 @@ class JavdbParser(BaseMovieParser):
     def _parse_series(self, soup: BeautifulSoup, movie: Movie):
         """解析系列信息"""
         try:
-            series_block = soup.select_one('.panel-block:contains("系列")')
+            series_block = _SEL_SERIES_BLOCK.select_one(soup)
             if series_block:
-                series_links = series_block.select('a')
+                series_links = _SEL_LINK.select(series_block)
                 for series_link in series_links:
                     series = Series()
                     series.name = series_link.text.strip()
@@ -203,9 +224,9 @@ class JavdbParser(BaseMovieParser):
     def _parse_studio(self, soup: BeautifulSoup, movie: Movie):
         """解析制作商信息"""
         try:
-            studio_block = soup.select_one('.panel-block:contains("片商")')
+            studio_block = _SEL_STUDIO_BLOCK.select_one(soup)
             if studio_block:
-                studio_link = studio_block.select_one('a')
+                studio_link = _SEL_LINK.select_one(studio_block)
                 if studio_link:
                     studio = Studio()
                     studio.name = studio_link.text.strip()
@@ -222,7 +243,7 @@ class JavdbParser(BaseMovieParser):
     def _parse_user_stats(self, soup: BeautifulSoup, movie: Movie):
         """解析用户统计信息"""
         try:
-            stats = soup.select_one('.video-meta-panel .is-size-7')
+            stats = _SEL_USER_STATS.select_one(soup)
             if stats:
                 stats_text = self._safe_extract_text(stats)
                 wanted_match = re.search(r'(\d+)人想看', stats_text)
@@ -257,7 +278,7 @@ class JavdbParser(BaseMovieParser):
     def _parse_magnets(self, soup: BeautifulSoup, movie: Movie):
         """解析磁力链接信息"""
         try:
-            magnets = soup.select('.magnet-links .item')
+            magnets = _SEL_MAGNETS.select(soup)
             if magnets:
                 movie.have_mg = 1
                 for line_number, magnet in enumerate(magnets, start=1):
@@ -284,10 +305,10 @@ class JavdbParser(BaseMovieParser):
             magnet = Magnet()
 
             # 解析名称和大小
-            name_elem = magnet_elem.select_one('.magnet-name a')
+            name_elem = _SEL_MAGNET_NAME.select_one(magnet_elem)
             if name_elem:
-                magnet.title = name_elem.select_one('.name').text.strip()
-                size_text = name_elem.select_one('.meta').text.strip()
+                magnet.title = _SEL_NAME.select_one(name_elem).text.strip()
+                size_text = _SEL_META.select_one(name_elem).text.strip()
                 size_match = re.search(r'([\d.]+)([GMK]B)', size_text)
                 if size_match:
                     size_num = float(size_match.group(1))
@@ -297,21 +318,21 @@ class JavdbParser(BaseMovieParser):
                     magnet.size = int(size_num * unit_multipliers.get(size_unit, 1))
 
             # 解析磁力链接
-            magnet_link = magnet_elem.select_one('a')['href']
+            magnet_link = _SEL_LINK.select_one(magnet_elem)['href']
             magnet.name = magnet_link
             if magnet_link.startswith('magnet:?xt='):
                 magnet.magnet_xt = magnet_link.split('btih:')[1].split('&')[0]
 
             # 检查是否高清
-            if magnet_elem.select_one('.tag.is-primary'):
+            if _SEL_TAG_HD.select_one(magnet_elem):
                 magnet.have_hd = 1
 
             # 检查是否有字幕
-            if magnet_elem.select_one('.tag.is-warning'):
+            if _SEL_TAG_SUB.select_one(magnet_elem):
                 magnet.have_sub = 1
 
             # 解析日期
-            date_elem = magnet_elem.select_one('.date .time')
+            date_elem = _SEL_DATE.select_one(magnet_elem)
             if date_elem:
                 magnet.date = datetime.strptime(date_elem.text.strip(), '%Y-%m-%d')
 
@@ -0,0 +1,34 @@
+# app/utils/rate_limit_util.py
+"""令牌桶限流：多个抓取线程共享同一个限流器，限制对目标站点的总请求速率"""
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        """
+        Args:
+            rate_per_minute: 每分钟允许的平均请求数，<=0 表示不限流
+            burst: 允许的突发请求数（令牌桶容量）
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取得一个令牌，令牌不足时阻塞当前线程直到补足"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            # 在锁外等待，其他线程可同时计算各自的等待时间
+            time.sleep(wait)
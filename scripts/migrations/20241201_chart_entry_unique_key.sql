@@ -0,0 +1,18 @@
+-- 榜单条目(chart_id, movie_id)唯一键
+-- 榜单条目改为 INSERT ... ON DUPLICATE KEY UPDATE 写入，依赖该唯一键判断条目是否已存在；
+-- 缺少该键时每次重复运行都会插入重复条目，程序启动时会检查并拒绝运行。
+--
+-- 执行方式（先备份chart_entry表）：
+--   mysql -h <host> -P <port> -u <user> -p <dbname> < scripts/migrations/20241201_chart_entry_unique_key.sql
+
+-- 1. 清理已有的重复条目：同一(chart_id, movie_id)只保留id最大（最近写入）的一条
+DELETE ce
+FROM chart_entry ce
+JOIN chart_entry newer
+  ON newer.chart_id = ce.chart_id
+ AND newer.movie_id = ce.movie_id
+ AND newer.id > ce.id;
+
+-- 2. 添加唯一键
+ALTER TABLE chart_entry
+    ADD UNIQUE KEY uk_chart_entry_chart_movie (chart_id, movie_id);
@@ -0,0 +1,53 @@
+# tests/dao/test_chart_entry_dao.py
+import unittest
+
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.dialects import mysql
+
+from app.dao.chart_entry_dao import ChartEntryDAO
+from app.utils.db_util import db
+from tests.helpers import SqliteAppTestCase
+
+
+class TestChartEntryDAO(SqliteAppTestCase):
+    """ChartEntryDAO的单元测试类，使用内存SQLite建表检查实际表结构"""
+
+    def _create_table(self, unique: bool):
+        ddl = "CREATE TABLE chart_entry (id INTEGER PRIMARY KEY, chart_id INTEGER, movie_id INTEGER"
+        ddl += ", CONSTRAINT uk_chart_entry_chart_movie UNIQUE (chart_id, movie_id))" if unique else ")"
+        with db.engine.begin() as conn:
+            conn.execute(text(ddl))
+
+    def test_has_unique_key(self):
+        self._create_table(unique=True)
+        dao = ChartEntryDAO()
+        self.assertTrue(dao.has_unique_key(['chart_id', 'movie_id']))
+        self.assertTrue(dao.has_unique_key(['movie_id', 'chart_id']))
+        self.assertFalse(dao.has_unique_key(['chart_id']))
+
+    def test_has_unique_key_missing(self):
+        self._create_table(unique=False)
+        self.assertFalse(ChartEntryDAO().has_unique_key(['chart_id', 'movie_id']))
+
+    def _compiled_upsert(self, rows, update_fields) -> str:
+        dao = ChartEntryDAO()
+        with patch.object(db.session, 'execute') as execute, patch.object(dao, '_commit'):
+            dao.upsert_many(rows, update_fields)
+        return str(execute.call_args.args[0].compile(dialect=mysql.dialect()))
+
+    def test_upsert_many_updates_given_fields(self):
+        sql = self._compiled_upsert([{'chart_id': 1, 'movie_id': 1, 'rank': 1},
+                                     {'chart_id': 1, 'movie_id': 2, 'rank': 2}], ['rank'])
+        self.assertIn('ON DUPLICATE KEY UPDATE `rank` = VALUES(`rank`)', sql)
+        self.assertEqual(sql.count('(%s, %s, %s)'), 2)
+
+    def test_upsert_many_without_update_fields_is_noop_update(self):
+        sql = self._compiled_upsert([{'chart_id': 1, 'movie_id': 1}], [])
+        self.assertNotIn('IGNORE', sql)
+        self.assertIn('ON DUPLICATE KEY UPDATE movie_id = VALUES(movie_id)', sql)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+# tests/helpers.py
+"""单元测试共用的构造工具"""
+import unittest
+from unittest.mock import MagicMock
+
+from flask import Flask
+
+from app.utils.db_util import db
+
+
+def bare_instance(cls, mocks=(), **attrs):
+    """
+    跳过__init__构造实例：不读取配置、不连接数据库、Redis等外部服务
+
+    Args:
+        cls: 要构造的类
+        mocks: 需要替换为MagicMock的属性名
+        attrs: 其余直接赋值的属性
+    """
+    instance = cls.__new__(cls)
+    for name in mocks:
+        setattr(instance, name, MagicMock())
+    for name, value in attrs.items():
+        setattr(instance, name, value)
+    return instance
+
+
+class SqliteAppTestCase(unittest.TestCase):
+    """推入使用内存SQLite的Flask应用上下文，供需要db.session的测试使用"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        db.session.remove()
+        self.ctx.pop()
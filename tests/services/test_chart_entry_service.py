@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import MagicMock
+
+from app.services.chart_entry_service import ChartEntryService
+from tests.helpers import bare_instance
+
+
+class TestChartEntryService(unittest.TestCase):
+    """ChartEntryService 的单元测试类，DAO 使用 Mock 对象替换"""
+
+    def setUp(self):
+        self.service = bare_instance(ChartEntryService, mocks=['dao'])
+
+    def test_ensure_unique_key_passes_when_key_exists(self):
+        self.service.dao.has_unique_key.return_value = True
+        self.service.ensure_unique_key()
+        self.service.dao.has_unique_key.assert_called_once_with(['chart_id', 'movie_id'])
+
+    def test_ensure_unique_key_raises_when_key_missing(self):
+        self.service.dao.has_unique_key.return_value = False
+        with self.assertRaises(RuntimeError) as ctx:
+            self.service.ensure_unique_key()
+        self.assertIn(ChartEntryService.UNIQUE_KEY_MIGRATION, str(ctx.exception))
+
+    def test_upsert_many_groups_rows_by_columns(self):
+        rows = [
+            {'chart_id': 1, 'movie_id': 1, 'rank': 1},
+            {'chart_id': 1, 'movie_id': 2},
+            {'chart_id': 1, 'movie_id': 3, 'rank': 3},
+        ]
+        self.service.upsert_many(rows)
+
+        calls = self.service.dao.upsert_many.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0].args, ([rows[0], rows[2]], ['rank']))
+        self.assertEqual(calls[1].args, ([rows[1]], []))
+
+    def test_build_upsert_values_skips_unset_fields(self):
+        entry = MagicMock(name='entry', spec=['name', 'rank', 'score', 'votes'])
+        entry.name, entry.rank, entry.score, entry.votes = 'n', 5, None, None
+        self.assertEqual(self.service.build_upsert_values(entry, 1, 2),
+                         {'chart_id': 1, 'movie_id': 2, 'name': 'n', 'rank': 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
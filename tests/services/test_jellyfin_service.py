@@ -1,4 +1,5 @@
 import unittest
+from types import SimpleNamespace
 from typing import Optional, Dict, List
 from unittest.mock import Mock, patch
 from app.services.jellyfin_service import JellyfinService
@@ -106,6 +107,17 @@ class TestJellyfinService(unittest.TestCase):
         self.assertEqual(result, mock_movies)
         self.mock_util.get_all_movie_info.assert_called_once()
 
+    def test_get_all_movie_names_covers_all_libraries(self):
+        """测试电影名快照与按番号搜索范围一致，不限定默认库"""
+        util = Mock()
+        util.get_all_library_movie_info.return_value = [SimpleNamespace(name='ABC-001'), SimpleNamespace(name=None)]
+
+        result = JellyfinService(util).get_all_movie_names()
+
+        self.assertEqual(result, ['ABC-001'])
+        util.get_all_library_movie_info.assert_called_once_with()
+        util.get_all_movie_info.assert_not_called()
+
     @patch('logging.info')
     def test_logging(self, mock_logging):
         """测试日志记录功能"""
@@ -0,0 +1,320 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import patch
+
+from app.model.db.movie_model import Movie, Actor, Studio, Chart, ChartEntry, Magnet
+from app.services.scraper_service import ScraperService
+from app.utils.http_util import ProxyExhaustedError
+from app.utils.json_util import JsonUtil
+from tests.helpers import bare_instance, SqliteAppTestCase
+
+
+class FakeEntityService:
+    """按名称保存实体的内存服务，模拟 get_by_names/batch_create 等接口"""
+
+    def __init__(self):
+        self.rows: Dict[str, object] = {}
+        self.created: List[object] = []
+
+    def _save(self, entity):
+        entity.id = len(self.rows) + 1
+        self.rows[entity.name] = entity
+        self.created.append(entity)
+        return entity
+
+    def get_by_names(self, names):
+        return {name: self.rows[name] for name in names if name in self.rows}
+
+    def get_by_name(self, name):
+        return self.rows.get(name)
+
+    def create(self, entity):
+        return self._save(entity)
+
+    def batch_create(self, entities):
+        return [self._save(entity) for entity in entities]
+
+
+class TestScraperServiceRelations(unittest.TestCase):
+    """关联实体解析：新建的实体必须关联到电影上"""
+
+    def setUp(self):
+        # 只测试关联实体解析，不初始化网络、数据库等依赖
+        self.scraper = bare_instance(ScraperService, _entity_cache={}, _missing_keys=set(), service_map={
+            key: FakeEntityService()
+            for key in ['studio', *ScraperService._RELATION_MAP.values()]
+        })
+
+    @staticmethod
+    def _parsed_movie() -> Movie:
+        """与解析器一致：通过append和赋值建立关联，反向引用随之填充"""
+        movie = Movie(serial_number='ABC-001')
+        movie.actors.append(Actor(name='actor_a'))
+        movie.actors.append(Actor(name='actor_b'))
+        movie.studio = Studio(name='studio_s')
+        return movie
+
+    def test_new_entities_stay_on_movie_after_chart_prefetch(self):
+        movie = self._parsed_movie()
+
+        self.scraper._prefetch_chart_entities([movie])
+        self.scraper._process_all_relations(movie)
+
+        self.assertEqual([actor.name for actor in movie.actors], ['actor_a', 'actor_b'])
+        self.assertTrue(all(actor.id for actor in movie.actors))
+        self.assertEqual(movie.studio.name, 'studio_s')
+        self.assertIsNotNone(movie.studio.id)
+
+    def test_new_entities_added_when_updating_existing_movie(self):
+        existing = Movie(serial_number='ABC-001')
+        new = self._parsed_movie()
+
+        self.scraper._prefetch_chart_entities([new])
+        self.scraper._update_relations(existing, new)
+
+        self.assertEqual([actor.name for actor in existing.actors], ['actor_a', 'actor_b'])
+        self.assertEqual(existing.studio.name, 'studio_s')
+
+    def test_new_entities_stay_on_movie_without_chart_prefetch(self):
+        movie = self._parsed_movie()
+
+        self.scraper._process_all_relations(movie)
+
+        self.assertEqual([actor.name for actor in movie.actors], ['actor_a', 'actor_b'])
+        self.assertEqual(movie.studio.name, 'studio_s')
+        self.assertIsNotNone(movie.studio.id)
+
+    def test_bulk_create_inserts_copies(self):
+        movie = self._parsed_movie()
+        parsed_actors = list(movie.actors)
+
+        self.scraper._prefetch_chart_entities([movie])
+
+        created = self.scraper.service_map['actor'].created
+        self.assertEqual([actor.name for actor in created], ['actor_a', 'actor_b'])
+        self.assertTrue(all(actor not in parsed_actors for actor in created))
+        self.assertEqual(list(movie.actors), parsed_actors)
+
+    def test_magnets_created_with_their_movie(self):
+        movie = self._parsed_movie()
+        movie.magnets.append(Magnet(name='magnet_m', magnet_xt='abc'))
+
+        self.scraper._prefetch_chart_entities([movie])
+        self.scraper._process_all_relations(movie)
+
+        # 磁力不单独插入，挂在电影上随电影写入
+        self.assertEqual(self.scraper.service_map['magnet'].created, [])
+        self.assertEqual([(m.name, m.magnet_xt) for m in movie.magnets], [('magnet_m', 'abc')])
+        self.assertIs(movie.magnets[0].movie, movie)
+
+    def test_existing_magnet_reused(self):
+        stored = self.scraper.service_map['magnet'].create(Magnet(name='magnet_m'))
+        movie = self._parsed_movie()
+        movie.magnets.append(Magnet(name='magnet_m'))
+
+        self.scraper._prefetch_chart_entities([movie])
+        self.scraper._process_all_relations(movie)
+
+        self.assertEqual(list(movie.magnets), [stored])
+
+
+class TestScraperServiceUpdateMovie(unittest.TestCase):
+    """更新已有电影：只写入变化的字段，无变化时不调用update"""
+
+    def setUp(self):
+        self.scraper = bare_instance(ScraperService, mocks=['movie_service'])
+        self.scraper.movie_service.update.side_effect = lambda movie: movie
+
+    def test_unchanged_movie_skips_update(self):
+        existing = Movie(serial_number='ABC-001', title='t')
+        new = Movie(serial_number='ABC-001', title='t')
+        with patch.object(self.scraper, '_update_relations', return_value=False):
+            self.assertIs(self.scraper._update_movie(existing, new), existing)
+        self.scraper.movie_service.update.assert_not_called()
+
+    def test_changed_field_is_written(self):
+        existing = Movie(serial_number='ABC-001', title='old', name='n')
+        new = Movie(serial_number='ABC-001', title='new')
+        with patch.object(self.scraper, '_update_relations', return_value=False):
+            self.scraper._update_movie(existing, new)
+        self.assertEqual(existing.title, 'new')
+        # 新数据为空的字段不覆盖已有值
+        self.assertEqual(existing.name, 'n')
+        self.scraper.movie_service.update.assert_called_once_with(existing)
+
+    def test_relation_change_triggers_update(self):
+        existing = Movie(serial_number='ABC-001', title='t')
+        with patch.object(self.scraper, '_update_relations', return_value=True):
+            self.scraper._update_movie(existing, Movie(serial_number='ABC-001', title='t'))
+        self.scraper.movie_service.update.assert_called_once_with(existing)
+
+
+class TestScraperServiceKnownMovie(unittest.TestCase):
+    """无需抓取的电影：本次运行已入库的，或不刷新时库中已有的"""
+
+    def setUp(self):
+        self.scraper = bare_instance(ScraperService, _run_movies={},
+                                     _chart_existing_movies={'ABC-001': Movie(serial_number='ABC-001')})
+        self.entry = ChartEntry()
+        self.entry.serial_number = 'abc-001'
+
+    def test_existing_movie_refetched_when_refreshing(self):
+        self.scraper.refresh_existing = True
+        self.assertIsNone(self.scraper._get_known_movie(self.entry))
+
+    def test_existing_movie_reused_without_refresh(self):
+        self.scraper.refresh_existing = False
+        self.assertIs(self.scraper._get_known_movie(self.entry),
+                      self.scraper._chart_existing_movies['ABC-001'])
+
+    def test_run_movie_always_reused(self):
+        self.scraper.refresh_existing = True
+        saved = Movie(serial_number='ABC-001')
+        self.scraper._run_movies['ABC-001'] = saved
+        self.assertIs(self.scraper._get_known_movie(self.entry), saved)
+
+    def test_known_movie_skips_fetch(self):
+        self.scraper.refresh_existing = False
+        with patch.object(self.scraper, '_fetch_and_process_movie') as fetch:
+            self.assertEqual(self.scraper._fetch_entry_movie(self.entry), (None, None))
+        fetch.assert_not_called()
+
+
+class TestScraperServiceJellyfinIndex(unittest.TestCase):
+    """Jellyfin库判断：一次取回全部电影名，失败时回退为逐部查询"""
+
+    def setUp(self):
+        self.scraper = bare_instance(ScraperService, mocks=['jellyfin_service'])
+
+    def test_index_lookup_is_case_insensitive(self):
+        self.scraper.jellyfin_service.get_all_movie_names.return_value = ['abc-001 title', 'XYZ-002']
+        self.scraper._load_jellyfin_index()
+
+        self.assertTrue(self.scraper._in_jellyfin('ABC-001'))
+        self.assertTrue(self.scraper._in_jellyfin('xyz-002'))
+        self.assertFalse(self.scraper._in_jellyfin('ABC-003'))
+        self.scraper.jellyfin_service.check_movie_exists.assert_not_called()
+
+    def test_index_matches_whole_serial_only(self):
+        self.scraper.jellyfin_service.get_all_movie_names.return_value = ['ABC-123 title', '[XYZ-045-C] other']
+        self.scraper._load_jellyfin_index()
+
+        self.assertFalse(self.scraper._in_jellyfin('ABC-12'))
+        self.assertFalse(self.scraper._in_jellyfin('BC-123'))
+        self.assertTrue(self.scraper._in_jellyfin('ABC-123'))
+        self.assertTrue(self.scraper._in_jellyfin('XYZ-045'))
+        self.scraper.jellyfin_service.check_movie_exists.assert_not_called()
+
+    def test_falls_back_to_per_movie_query(self):
+        self.scraper.jellyfin_service.get_all_movie_names.side_effect = RuntimeError('down')
+        self.scraper.jellyfin_service.check_movie_exists.return_value = True
+        self.scraper._load_jellyfin_index()
+
+        self.assertTrue(self.scraper._in_jellyfin('ABC-001'))
+        self.scraper.jellyfin_service.check_movie_exists.assert_called_once_with(title='ABC-001')
+
+
+class TestScraperServiceDetailUriCache(unittest.TestCase):
+    """番号到详情页URI的缓存：带过期时间写入，详情页失败时删除"""
+
+    def setUp(self):
+        self.scraper = bare_instance(ScraperService, mocks=['cache_service', 'http_util', 'parser'],
+                                     base_url='https://javdb.com', serial_uri_ttl=100)
+        self.entry = ChartEntry()
+        self.entry.serial_number = 'abc-001'
+        self.entry.uri = ''
+
+    def test_cache_detail_uri_sets_expiry(self):
+        self.scraper._cache_detail_uri('abc-001', '/v/x')
+        self.scraper.cache_service.set.assert_called_once_with('javdb:serial_uri:ABC-001', {'uri': '/v/x'}, 100)
+
+    def test_cached_uri_is_used(self):
+        self.scraper.cache_service.get.return_value = {'uri': '/v/x'}
+        self.assertEqual(self.scraper._get_movie_detail_page_url(self.entry), '/v/x')
+        self.scraper.http_util.request.assert_not_called()
+
+    def test_failed_detail_fetch_drops_cached_uri(self):
+        self.scraper.cache_service.get.return_value = {'uri': '/v/x'}
+        self.scraper.http_util.request.return_value = None
+
+        self.assertIsNone(self.scraper._fetch_movie_info(self.entry))
+        self.scraper.cache_service.delete.assert_called_once_with('javdb:serial_uri:ABC-001')
+
+
+class TestScraperServiceChartFailure(SqliteAppTestCase):
+    """榜单级失败：回滚该榜单、记录全部条目，不中断后续榜单"""
+
+    def setUp(self):
+        super().setUp()
+        self.scraper = bare_instance(
+            ScraperService, scrape_workers=2, refresh_existing=True, _entity_cache={}, _missing_keys=set(),
+            _run_movies={}, _chart_existing_movies={}, _chart_failed_serials=set(), _failed_path=None,
+            _failed_fp=None)
+
+    def test_chart_failure_records_entries_and_continues(self):
+        chart = Chart(name='chart_a')
+        chart.entries = [ChartEntry(rank=1), ChartEntry(rank=2)]
+        chart.entries[0].serial_number = 'ABC-001'
+        chart.entries[1].serial_number = 'ABC-002'
+        movies = [Movie(serial_number='ABC-001'), Movie(serial_number='ABC-002')]
+
+        with patch.object(self.scraper, '_fetch_entry_movie', side_effect=[(m, None) for m in movies]), \
+                patch.object(self.scraper, '_prefetch_chart_entities'), \
+                patch.object(self.scraper, '_prefetch_existing_movies'), \
+                patch.object(self.scraper, '_persist_movie', side_effect=movies), \
+                patch.object(self.scraper, '_save_chart_entries', side_effect=RuntimeError('boom')), \
+                patch.object(self.scraper, '_add_failed_entry') as add_failed:
+            self.scraper._process_chart(chart)
+
+        self.assertEqual([call.args[0].serial_number for call in add_failed.call_args_list],
+                         ['ABC-001', 'ABC-002'])
+        self.assertTrue(all('boom' in call.args[2] for call in add_failed.call_args_list))
+
+    def test_chart_failure_does_not_duplicate_entry_failures(self):
+        chart = Chart(name='chart_a')
+        chart.entries = [ChartEntry(rank=1), ChartEntry(rank=2)]
+        chart.entries[0].serial_number = 'ABC-001'
+        chart.entries[1].serial_number = 'ABC-002'
+        movies = [Movie(serial_number='ABC-001'), Movie(serial_number='ABC-002')]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            failed_path = self.scraper._failed_path = Path(tmp) / 'failed.jsonl'
+            with patch.object(self.scraper, '_fetch_entry_movie', side_effect=[(m, None) for m in movies]), \
+                    patch.object(self.scraper, '_prefetch_chart_entities'), \
+                    patch.object(self.scraper, '_prefetch_existing_movies'), \
+                    patch.object(self.scraper, '_persist_movie', side_effect=[RuntimeError('entry'), movies[1]]), \
+                    patch.object(self.scraper, '_save_chart_entries', side_effect=RuntimeError('chart')):
+                self.scraper._process_chart(chart)
+            self.scraper._close_failed_log()
+            rows = [JsonUtil.loads(line) for line in failed_path.read_text(encoding='utf-8').splitlines()]
+
+        self.assertEqual([(row['serial_number'], row['error']) for row in rows],
+                         [('ABC-001', 'entry'), ('ABC-002', '榜单整体回滚: chart')])
+
+    def test_proxy_exhausted_cancels_pending_fetches(self):
+        self.scraper.scrape_workers = 1
+        chart = Chart(name='chart_a')
+        chart.entries = [ChartEntry(rank=i) for i in range(20)]
+        for i, entry in enumerate(chart.entries):
+            entry.serial_number = f'ABC-{i:03d}'
+
+        def fetch(entry):
+            if entry.rank == 0:
+                raise ProxyExhaustedError('banned')
+            time.sleep(0.05)
+            return None, None
+
+        with patch.object(self.scraper, '_fetch_and_process_movie', side_effect=fetch) as fetch_mock, \
+                patch.object(self.scraper, '_add_failed_entry') as add_failed:
+            with self.assertRaises(ProxyExhaustedError):
+                self.scraper._process_chart(chart)
+
+        self.assertLess(fetch_mock.call_count, len(chart.entries))
+        add_failed.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from app.utils.http_util import HttpUtil, BANNED_MARKER, ProxyExhaustedError
+from tests.helpers import bare_instance
+
+
+def _make_util(fresh_seconds: int = 0) -> HttpUtil:
+    """不读取配置、不连接Redis和代理，只设置request用到的属性"""
+    util = bare_instance(HttpUtil, mocks=['_cache', 'session', 'rate_limiter'],
+                         proxy_host='127.0.0.1', proxy_port=7890, http_cache_enabled=True, http_cache_ttl=3600,
+                         http_cache_fresh_seconds=fresh_seconds, _proxy_generation=0)
+    util._cache.get.return_value = None
+    return util
+
+
+def _response(text: str, status_code: int = 200, headers=None) -> MagicMock:
+    response = MagicMock()
+    response.text = text
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestHttpUtilPageCacheDefaults(unittest.TestCase):
+    """页面缓存默认关闭，关闭时不访问缓存"""
+
+    def test_disabled_by_default(self):
+        util = HttpUtil()
+        self.assertFalse(util.http_cache_enabled)
+        self.assertIsNone(util._get_cache())
+
+
+class TestHttpUtilFreshCache(unittest.TestCase):
+    """新鲜期内的缓存页面直接返回，不发请求"""
+
+    def test_fresh_cache_skips_request(self):
+        util = _make_util(fresh_seconds=60)
+        util._cache.get.return_value = {'body': '<p>cached</p>', 'cached_at': time.time()}
+
+        soup = util.request('https://javdb.com/x')
+
+        self.assertEqual(soup.p.text, 'cached')
+        util.session.get.assert_not_called()
+
+    def test_stale_cache_sends_conditional_request(self):
+        util = _make_util(fresh_seconds=60)
+        util._cache.get.return_value = {'body': '<p>cached</p>', 'etag': 'e1', 'cached_at': time.time() - 120}
+        util.session.get.return_value = _response('', status_code=304)
+
+        soup = util.request('https://javdb.com/x')
+
+        self.assertEqual(soup.p.text, 'cached')
+        self.assertEqual(util.session.get.call_args.kwargs['headers']['If-None-Match'], 'e1')
+
+    def test_fresh_window_disabled_by_default(self):
+        util = _make_util()
+        util._cache.get.return_value = {'body': '<p>cached</p>', 'cached_at': time.time()}
+        util.session.get.return_value = _response('<p>new</p>')
+
+        self.assertEqual(util.request('https://javdb.com/x').p.text, 'new')
+        # 没有校验头且未开启新鲜期，不缓存
+        util._cache.set.assert_not_called()
+
+    def test_response_without_validators_cached_when_fresh_window_enabled(self):
+        util = _make_util(fresh_seconds=60)
+        util.session.get.return_value = _response('<p>new</p>')
+
+        util.request('https://javdb.com/x')
+
+        key, value, ttl = util._cache.set.call_args.args
+        self.assertEqual(key, 'javdb:page:https://javdb.com/x')
+        self.assertEqual(value['body'], '<p>new</p>')
+        self.assertIn('cached_at', value)
+        self.assertEqual(ttl, 3600)
+
+    def test_only_clean_200_responses_cached(self):
+        util = _make_util(fresh_seconds=60)
+        util._cache_response('https://javdb.com/x', _response('<p>partial</p>', status_code=203))
+        util._cache_response('https://javdb.com/x', _response(f'<p>{BANNED_MARKER}</p>'))
+        util._cache.set.assert_not_called()
+
+    def test_cached_ban_page_dropped(self):
+        util = _make_util(fresh_seconds=60)
+        util._cache.get.return_value = {'body': f'<p>{BANNED_MARKER}</p>', 'cached_at': time.time()}
+        util.session.get.return_value = _response('<p>ok</p>')
+
+        self.assertEqual(util.request('https://javdb.com/x').p.text, 'ok')
+        util._cache.delete.assert_called_once_with('javdb:page:https://javdb.com/x')
+
+
+class TestHttpUtilBannedPage(unittest.TestCase):
+    """在原始HTML上识别封禁页：切换代理后重试，封禁页不缓存"""
+
+    def test_banned_page_switches_proxy_and_retries(self):
+        util = _make_util()
+        util.change_proxy = MagicMock(return_value=True)
+        # 原始HTML中撇号可能被转义，标记只取撇号之前的部分
+        banned = _response(f'<p>{BANNED_MARKER}&#39;s signature</p>')
+        util.session.get.side_effect = [banned, _response('<p>ok</p>')]
+
+        self.assertEqual(util.request('https://javdb.com/x').p.text, 'ok')
+        util.change_proxy.assert_called_once_with(0)
+        util._cache.set.assert_not_called()
+
+    def test_no_proxy_left_raises(self):
+        util = _make_util()
+        util.change_proxy = MagicMock(return_value=False)
+        util.session.get.return_value = _response(f'<p>{BANNED_MARKER}</p>')
+
+        with self.assertRaises(ProxyExhaustedError):
+            util.request('https://javdb.com/x')
+
+    def test_normal_page_does_not_switch_proxy(self):
+        util = _make_util()
+        util.change_proxy = MagicMock()
+        util.session.get.return_value = _response('<p>ok</p>')
+
+        util.request('https://javdb.com/x')
+        util.change_proxy.assert_not_called()
+
+
+class TestHttpUtilChangeProxy(unittest.TestCase):
+    """并发切换代理：其他线程已切换过时不再拉黑新代理"""
+
+    def setUp(self):
+        self.util = bare_instance(HttpUtil, proxy_blacklist={}, _proxy_lock=threading.Lock(), _proxy_generation=0)
+        self.util._get_selector_proxies = MagicMock(return_value={'now': 'proxy_a'})
+        self.util.get_best_available_proxy = MagicMock(return_value='proxy_b')
+        self.util._switch_proxy = MagicMock(return_value=True)
+
+    def test_switch_blacklists_current_and_bumps_generation(self):
+        self.assertTrue(self.util.change_proxy(0))
+        self.assertIn('proxy_a', self.util.proxy_blacklist)
+        self.assertEqual(self.util._proxy_generation, 1)
+
+    def test_stale_generation_reuses_switched_proxy(self):
+        self.util._proxy_generation = 1
+
+        self.assertTrue(self.util.change_proxy(0))
+        self.assertEqual(self.util.proxy_blacklist, {})
+        self.util._switch_proxy.assert_not_called()
+
+    def test_failed_switch_keeps_generation(self):
+        self.util._switch_proxy.return_value = False
+
+        self.assertFalse(self.util.change_proxy(0))
+        self.assertEqual(self.util._proxy_generation, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.utils import json_util
+from app.utils.json_util import JsonUtil
+
+
+class TestJsonUtil(unittest.TestCase):
+    """orjson与标准库两种实现的行为必须一致"""
+
+    def _both(self, func):
+        results = [func()]
+        with patch.object(json_util, 'orjson', None):
+            results.append(func())
+        return results
+
+    def test_non_ascii_kept(self):
+        for text in self._both(lambda: JsonUtil.dumps({'name': '演员'})):
+            self.assertIn('演员', text)
+
+    def test_unserializable_value_becomes_string(self):
+        for text in self._both(lambda: JsonUtil.dumps({'score': Decimal('8.5')})):
+            self.assertEqual(JsonUtil.loads(text), {'score': '8.5'})
+
+    def test_datetime_format_matches(self):
+        data = {'at': datetime(2024, 1, 1, 8, 30, 15), 'on': date(2024, 1, 1)}
+        with_orjson, fallback = self._both(lambda: JsonUtil.dumps(data))
+        self.assertEqual(with_orjson, fallback)
+        self.assertEqual(JsonUtil.loads(fallback), {'at': '2024-01-01T08:30:15', 'on': '2024-01-01'})
+
+    def test_round_trip(self):
+        data = {'a': [1, 2, {'b': None}], 'c': True}
+        for loaded in self._both(lambda: JsonUtil.loads(JsonUtil.dumps(data))):
+            self.assertEqual(loaded, data)
+
+    def test_loads_bytes(self):
+        for loaded in self._both(lambda: JsonUtil.loads('{"k": 1}'.encode('utf-8'))):
+            self.assertEqual(loaded, {'k': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+
+from app.utils.rate_limit_util import RateLimiter
+
+
+class FakeClock:
+    """可控时钟：sleep只推进时间，不真正等待"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch('app.utils.rate_limit_util.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_does_not_wait(self):
+        limiter = RateLimiter(rate_per_minute=60, burst=3)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_for_refill_after_burst(self):
+        limiter = RateLimiter(rate_per_minute=60, burst=2)
+        for _ in range(2):
+            limiter.acquire()
+
+        limiter.acquire()
+
+        # 每秒补充一个令牌，桶空后第三次需要等待约1秒
+        self.assertAlmostEqual(sum(self.clock.sleeps), 1.0)
+
+    def test_refill_over_time_is_capped_by_burst(self):
+        limiter = RateLimiter(rate_per_minute=60, burst=2)
+        limiter.acquire()
+        limiter.acquire()
+
+        # 空闲很久也最多攒满burst个令牌
+        self.clock.now += 100
+        limiter.acquire()
+        limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        limiter.acquire()
+        self.assertAlmostEqual(sum(self.clock.sleeps), 1.0)
+
+    def test_non_positive_rate_disables_limit(self):
+        for rate in (0, -1):
+            limiter = RateLimiter(rate_per_minute=rate, burst=1)
+            for _ in range(100):
+                limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+
+if __name__ == '__main__':
+    unittest.main()